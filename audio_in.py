@@ -4,7 +4,6 @@ speech to text using OpenAI Whisper.
 
 Dependencies (see requirements.txt):
     - sounddevice
-    - soundfile
     - numpy
     - openai
     - python-dotenv
@@ -15,15 +14,15 @@ swap in a different STT engine (e.g. on-device whisper.cpp) later.
 from __future__ import annotations
 
 import os
-import tempfile
-from typing import Optional
-import io
+import functools
+import asyncio
+import queue
+import struct
+from typing import Callable, Optional
 
 import numpy as np  # type: ignore
 import sounddevice as sd  # type: ignore
-import soundfile as sf  # type: ignore
 import time
-from collections import deque
 
 try:
     # openai>=1.0 uses the Client class pattern.
@@ -60,12 +59,199 @@ DEFAULT_RMS_THRESHOLD = 0.01
 # Set via `VAD_AGGRESSIVENESS` env var.
 DEFAULT_VAD_AGGRESSIVENESS = 1
 
+# Consecutive VAD speech frames (30 ms each) required before a command
+# recording starts. Filters out clicks and short noises without an RMS gate.
+SPEECH_START_FRAMES = 3
+
 DEFAULT_PROMPT = ""
 
+# _listen_while reads this many 30 ms VAD frames per stream read, gates
+# them with one vectorized RMS call and runs webrtcvad only on loud frames.
+VAD_FRAMES_PER_READ = 3
+
+# VAD frame duration; webrtcvad accepts 10, 20, or 30 ms
+VAD_FRAME_MS = 30
+
+# capture_audio_stream gives up if the input callback delivers nothing for this long.
+AUDIO_STALL_TIMEOUT = 2.0
+
+# Size of the canonical PCM WAV header written by _encode_wav
+WAV_HEADER_SIZE = 44
+
+
+def _create_vad(aggressiveness: int):
+    """
+    Returns the voice activity detector: Silero (ONNX) when `SILERO_VAD_MODEL`
+    points at a model file and onnxruntime is installed, otherwise WebRTC VAD.
+    Both expose `is_speech(pcm_bytes, sample_rate)`.
+    """
+    model_path = os.getenv("SILERO_VAD_MODEL")
+    if model_path:
+        try:
+            from silero_vad import SileroVad, DEFAULT_THRESHOLD
+            return SileroVad(model_path, threshold=float(os.getenv("SILERO_VAD_THRESHOLD", DEFAULT_THRESHOLD)))
+        except Exception as e:
+            print(f"Could not load Silero VAD ({e}), falling back to WebRTC VAD.")
+    return webrtcvad.Vad(aggressiveness)
+
+
+# Detectors are reused across calls (every recording and barge-in check).
+_vad_cache: dict = {}
+
+
+def _get_vad(aggressiveness: int):
+    """
+    Returns the shared detector for the current settings, creating it on first
+    use. Stateful detectors (Silero) are reset so each capture starts clean.
+    """
+    key = os.getenv("SILERO_VAD_MODEL") or aggressiveness
+    vad = _vad_cache.get(key)
+    if vad is None:
+        vad = _vad_cache[key] = _create_vad(aggressiveness)
+    elif hasattr(vad, "reset"):
+        vad.reset()
+    return vad
+
+
+def _frame_energy(batch: np.ndarray, frame_length: int) -> np.ndarray:
+    """
+    Per-frame sum of squared int16 samples for a block holding several
+    consecutive VAD frames. Compare against `_energy_threshold()` so the
+    per-frame check needs no square root or division.
+    """
+    frames = batch.reshape(-1, frame_length).astype(np.int64)
+    return np.einsum("ij,ij->i", frames, frames)
+
+
+def _energy_threshold(rms_threshold: float, frame_length: int) -> int:
+    """Converts a 0.0–1.0 RMS threshold into a per-frame sum-of-squares threshold."""
+    return int((rms_threshold * 32768.0) ** 2 * frame_length)
+
+
+@functools.lru_cache(maxsize=8)
+def _frame_config(fs: int, frame_ms: int, silence_s: float, rms_threshold: float) -> tuple[int, int, int]:
+    """
+    Derived per-stream constants, computed once per setting:
+    (samples per VAD frame, silent frames that end a recording, per-frame energy threshold).
+    """
+    frame_length = int(fs * frame_ms / 1000)
+    return frame_length, int(silence_s * 1000 / frame_ms), _energy_threshold(rms_threshold, frame_length)
+
+
+def _encode_wav(samples: np.ndarray, fs: int) -> bytearray:
+    """
+    Wraps int16 samples (frames x channels) in a canonical 44-byte PCM WAV
+    header. The samples are already 16-bit PCM, so no re-encoding is needed.
+    Returned as a bytearray (no extra copy); hashing, wave and np.frombuffer
+    all accept it as-is.
+    """
+    channels = samples.shape[1] if samples.ndim == 2 else 1
+    data_size = samples.size * 2
+    wav = bytearray(WAV_HEADER_SIZE + data_size)
+    struct.pack_into(
+        "<4sI4s4sIHHIIHH4sI", wav, 0,
+        b"RIFF", 36 + data_size, b"WAVE",
+        b"fmt ", 16, 1, channels, fs, fs * channels * 2, channels * 2, 16,
+        b"data", data_size,
+    )
+    # Copy the samples straight into the buffer behind the header (one copy, no tobytes())
+    np.frombuffer(wav, dtype="<i2", offset=WAV_HEADER_SIZE).reshape(samples.shape)[...] = samples
+    return wav
+
+
+def _wav_data_chunk(wav_bytes: bytes) -> tuple[int, int, int]:
+    """
+    Locates the PCM payload of a WAV buffer by walking its RIFF chunk headers.
+    Returns (data_offset, data_size, byte_rate) without decoding any samples.
+    """
+    if wav_bytes[:4] != b"RIFF" or wav_bytes[8:12] != b"WAVE":
+        raise ValueError("Not a RIFF/WAVE buffer")
+
+    byte_rate = 0
+    offset = 12
+    while offset + 8 <= len(wav_bytes):
+        chunk_id, chunk_size = struct.unpack_from("<4sI", wav_bytes, offset)
+        if chunk_id == b"fmt ":
+            byte_rate = struct.unpack_from("<I", wav_bytes, offset + 16)[0]
+        elif chunk_id == b"data":
+            if not byte_rate:
+                raise ValueError("WAV data chunk found before fmt chunk")
+            data_size = min(chunk_size, len(wav_bytes) - offset - 8)
+            return offset + 8, data_size, byte_rate
+        offset += 8 + chunk_size + (chunk_size & 1)
+    raise ValueError("WAV buffer has no data chunk")
+
+
+def _wav_duration(wav_bytes: bytes) -> float:
+    """Duration in seconds of a PCM WAV buffer, read from its RIFF header."""
+    _, data_size, byte_rate = _wav_data_chunk(wav_bytes)
+    return data_size / byte_rate
+
+
+def _is_near_silent(wav_bytes: bytes, rms_threshold: float) -> bool:
+    """
+    True if a 16-bit PCM WAV buffer looks like room noise: fewer than
+    SPEECH_START_FRAMES of its 30 ms frames reach the RMS threshold.
+    Judging frames rather than the whole file keeps the pre-roll and the
+    trailing silence that ends a capture from diluting a short, quiet command.
+    `rms_threshold` is in the same 0.0–1.0 units as VAD_RMS_THRESHOLD.
+    """
+    data_offset, data_size, byte_rate = _wav_data_chunk(wav_bytes)
+    samples = np.frombuffer(wav_bytes, dtype="<i2", count=data_size // 2, offset=data_offset)
+    frame_length = max(1, byte_rate // 2 * VAD_FRAME_MS // 1000)
+    usable = samples.size - samples.size % frame_length
+    if not usable:
+        return True
+    loud = _frame_energy(samples[:usable], frame_length) >= _energy_threshold(rms_threshold, frame_length)
+    return np.count_nonzero(loud) < SPEECH_START_FRAMES
+
+
+# Resolved on first use: importing speak at module load would pull in the TTS stack.
+_stop_speaking: Optional[Callable[[], None]] = None
+
+
+def _get_stop_speaking() -> Callable[[], None]:
+    """Returns speak.stop_speaking, or a no-op if TTS is unavailable."""
+    global _stop_speaking
+    if _stop_speaking is None:
+        try:
+            from speak import stop_speaking as _stop_speaking
+        except Exception:
+            _stop_speaking = lambda: None
+    return _stop_speaking
+
+
+def prewarm_transcriber() -> None:
+    """Starts loading the configured transcription model in the background."""
+    _get_prewarm()()
+
+
+def _get_prewarm() -> Callable[[], None]:
+    """Returns the model pre-load hook of the configured transcription engine."""
+    if _use_whisper():
+        from transcribe_whisper import prewarm_whisper
+        return prewarm_whisper
+    from transcribe_leopard import prewarm_leopard
+    return prewarm_leopard
+
+
+def _use_whisper() -> bool:
+    """True if STT_ENGINE selects faster-whisper instead of Leopard."""
+    return os.getenv("STT_ENGINE", "leopard").lower() == "whisper"
 
-def _rms(block: np.ndarray) -> float:
-    """Root-mean-square energy of an audio block."""
-    return float(np.sqrt(np.mean(np.square(block))))
+
+def _write_frame(recording: np.ndarray, pos: int, block: np.ndarray) -> tuple[np.ndarray, int]:
+    """
+    Copies an int16 block into a preallocated recording array at `pos`,
+    doubling the array only if it is full. Returns the array and new position.
+    """
+    end = pos + len(block)
+    if end > len(recording):
+        grown = np.empty((max(end, 2 * len(recording)), recording.shape[1]), dtype=recording.dtype)
+        grown[:pos] = recording[:pos]
+        recording = grown
+    recording[pos:end] = block
+    return recording, end
 
 
 def listen_for_speech(timeout: float) -> bool:
@@ -75,23 +261,39 @@ def listen_for_speech(timeout: float) -> bool:
     :param timeout: How long to listen in seconds.
     :return: True if speech is detected, False otherwise.
     """
-    vad = webrtcvad.Vad(int(os.getenv("VAD_AGGRESSIVENESS", DEFAULT_VAD_AGGRESSIVENESS)))
-    rms_threshold = float(os.getenv("VAD_RMS_THRESHOLD", DEFAULT_RMS_THRESHOLD))
+    deadline = time.time() + timeout
+    return _listen_while(lambda: time.time() < deadline)
+
+
+def listen_for_barge_in(is_speaking: Callable[[], bool]) -> bool:
+    """
+    Listens for the user talking over a reply, keeping one microphone stream
+    open for the whole playback instead of reopening it every poll.
+
+    :param is_speaking: Returns False once playback has finished.
+    :return: True as soon as speech is detected, False if playback ended first.
+    """
+    return _listen_while(is_speaking)
+
+
+def _listen_while(keep_listening: Callable[[], bool]) -> bool:
+    """Runs VAD on the microphone until speech is heard or *keep_listening* returns False."""
+    vad = _get_vad(int(os.getenv("VAD_AGGRESSIVENESS", DEFAULT_VAD_AGGRESSIVENESS)))
     fs = DEFAULT_FS
-    frame_duration_ms = 30
-    frame_length = int(fs * frame_duration_ms / 1000)
-    
-    start_time = time.time()
+    frame_length, _, energy_threshold = _frame_config(
+        fs, VAD_FRAME_MS, 0.0, float(os.getenv("VAD_RMS_THRESHOLD", DEFAULT_RMS_THRESHOLD))
+    )
     
+    batch_length = frame_length * VAD_FRAMES_PER_READ
+
     try:
-        with sd.InputStream(samplerate=fs, channels=DEFAULT_CHANNELS, dtype="int16", blocksize=frame_length) as stream:
-            while time.time() - start_time < timeout:
-                block, _ = stream.read(frame_length)
-                block_float = block.astype(np.float32) / 32768.0
-                
-                if _rms(block_float) >= rms_threshold:
-                    pcm_bytes = block.tobytes()
-                    if vad.is_speech(pcm_bytes, fs):
+        with sd.InputStream(samplerate=fs, channels=DEFAULT_CHANNELS, dtype="int16", blocksize=batch_length) as stream:
+            while keep_listening():
+                batch, _ = stream.read(batch_length)
+
+                for i in np.flatnonzero(_frame_energy(batch, frame_length) >= energy_threshold):
+                    frame = batch[i * frame_length:(i + 1) * frame_length]
+                    if vad.is_speech(memoryview(frame).cast("B"), fs):
                         return True
         return False
     except Exception as e:
@@ -104,83 +306,110 @@ def capture_audio_stream(
     fs: int = DEFAULT_FS,
     channels: int = DEFAULT_CHANNELS,
     *,
-    rms_threshold: float = float(os.getenv("VAD_RMS_THRESHOLD", DEFAULT_RMS_THRESHOLD)),
     aggressiveness: int = int(os.getenv("VAD_AGGRESSIVENESS", DEFAULT_VAD_AGGRESSIVENESS)),
     silence_duration: float = 1.0,
-) -> bytes | None:
+) -> bytearray | None:
     """
     Record microphone audio using VAD until silence is detected.
     Includes a pre-buffer to avoid clipping the start of speech.
+
+    Recording starts after SPEECH_START_FRAMES consecutive speech frames, so
+    VAD aggressiveness is the only sensitivity setting here (no RMS gate).
+    *max_seconds* bounds both the wait for speech and the recording itself,
+    since steady noise (TV, fan) can keep the VAD reporting speech forever.
     """
-    vad = webrtcvad.Vad(aggressiveness)
-    frame_duration_ms = 30  # VAD accepts 10, 20, or 30 ms
-    frame_length = int(fs * frame_duration_ms / 1000)
-    frames_needed_for_silence = int(silence_duration * 1000 / frame_duration_ms)
+    vad = _get_vad(aggressiveness)
+    frame_length, frames_needed_for_silence, _ = _frame_config(fs, VAD_FRAME_MS, silence_duration, 0.0)
 
-    # Buffer to store audio chunks before speech is detected
-    pre_buffer = deque(maxlen=int(0.5 * fs / frame_length)) # ~0.5 seconds of pre-buffering
+    # Ring buffer of the ~0.5 seconds of audio before speech is detected.
+    # Its length is a whole number of frames so a block never wraps around.
+    pre_buffer = np.empty((int(0.5 * fs / frame_length) * frame_length, channels), dtype=np.int16)
+    pre_buffer_pos = 0
+    pre_buffer_full = False
     
+    # Recorded int16 audio, sized for max_seconds up front and written in place.
+    max_frames = int(max_seconds * fs)
+    recording = np.empty((max_frames + frame_length, channels), dtype=np.int16)
+    recorded_frames = 0
+
     recording_started = False
-    chunks: list[np.ndarray] = []
+    speech_frames = 0
     silent_frames = 0
     start_time = time.time()
 
+    # PortAudio delivers frames from its own thread; the VAD state machine
+    # below consumes them, so a slow iteration never drops microphone audio.
+    captured: "queue.SimpleQueue[bytes]" = queue.SimpleQueue()
+
+    def _on_audio(indata, frame_count, time_info, status):
+        captured.put_nowait(bytes(indata))
+
+    # Resolve the speech-start hooks up front so no imports run once speech begins
+    stop_speaking = _get_stop_speaking()
+    prewarm = _get_prewarm()
+
     print("👂 Listening for command...")
     try:
-        with sd.InputStream(
-            samplerate=fs, channels=channels, dtype="int16", blocksize=frame_length
-        ) as stream:
+        with sd.RawInputStream(
+            samplerate=fs, channels=channels, dtype="int16", blocksize=frame_length, callback=_on_audio
+        ):
             while True:
                 # Timeout check
                 if not recording_started and time.time() - start_time > max_seconds:
                     print(f"⏱️  No speech detected for {max_seconds}s, timing out.")
                     return None
 
-                block, _ = stream.read(frame_length)
-                
-                is_speech = False
-                # VAD check only if volume is high enough
-                if _rms(block.astype(np.float32) / 32768.0) >= rms_threshold:
-                    if vad.is_speech(block.tobytes(), fs):
-                        is_speech = True
+                try:
+                    pcm = captured.get(timeout=AUDIO_STALL_TIMEOUT)
+                except queue.Empty:
+                    print("⚠️  No audio received from the microphone, stopping capture.")
+                    break
+
+                block = np.frombuffer(pcm, dtype=np.int16).reshape(-1, channels)
+                is_speech = vad.is_speech(pcm, fs)
 
+                if not recording_started:
+                    speech_frames = speech_frames + 1 if is_speech else 0
+                    if speech_frames < SPEECH_START_FRAMES:
+                        # Keep filling the pre-buffer
+                        pre_buffer[pre_buffer_pos:pre_buffer_pos + frame_length] = block
+                        pre_buffer_pos = (pre_buffer_pos + frame_length) % len(pre_buffer)
+                        if pre_buffer_pos == 0:
+                            pre_buffer_full = True
+                        continue
+
+                    recording_started = True
+                    print("🎙️  Recording started...")
+                    try: # Stop any TTS
+                        stop_speaking()
+                    except Exception: pass
+                    # Load the transcription model while the user is still talking
+                    prewarm()
+
+                    # Add the pre-buffered audio (including the first speech frames) to the recording
+                    if pre_buffer_full:
+                        recording, recorded_frames = _write_frame(recording, recorded_frames, pre_buffer[pre_buffer_pos:])
+                    recording, recorded_frames = _write_frame(recording, recorded_frames, pre_buffer[:pre_buffer_pos])
+
+                # Record speech and silence alike once recording has started
+                recording, recorded_frames = _write_frame(recording, recorded_frames, block)
+                if recorded_frames >= max_frames:
+                    print(f"⏱️  Reached the {max_seconds}s recording limit, stopping recording.")
+                    break
                 if is_speech:
-                    if not recording_started:
-                        recording_started = True
-                        print("🎙️  Recording started...")
-                        try: # Stop any TTS
-                            from speak import stop_speaking
-                            stop_speaking()
-                        except Exception: pass
-                        
-                        # Add the pre-buffered audio to the recording
-                        chunks.extend(list(pre_buffer))
-                        pre_buffer.clear()
-                    
-                    chunks.append(block)
                     silent_frames = 0
                 else:
-                    if not recording_started:
-                        # Keep filling the pre-buffer
-                        pre_buffer.append(block)
-                    else:
-                        # We are recording, and this is a silent frame
-                        chunks.append(block) # record the silence too
-                        silent_frames += 1
-                        if silent_frames >= frames_needed_for_silence:
-                            print("🛑 Detected silence, stopping recording.")
-                            break
+                    silent_frames += 1
+                    if silent_frames >= frames_needed_for_silence:
+                        print("🛑 Detected silence, stopping recording.")
+                        break
     except KeyboardInterrupt:
         raise SystemExit("Recording interrupted by user.") from None
 
-    if not chunks:
+    if not recorded_frames:
         return None
 
-    recording = np.concatenate(chunks, axis=0)
-    buffer = io.BytesIO()
-    sf.write(buffer, recording, fs, format='WAV', subtype='PCM_16')
-    buffer.seek(0)
-    return buffer.read()
+    return _encode_wav(recording[:recorded_frames], fs)
 
 
 def capture_and_transcribe(max_seconds: float = 15.0) -> str:
@@ -191,16 +420,28 @@ def capture_and_transcribe(max_seconds: float = 15.0) -> str:
 
     # Check for minimum audio length before processing
     try:
-        with io.BytesIO(audio_data) as buffer:
-            with sf.SoundFile(buffer, 'r') as sound_file:
-                duration = sound_file.frames / sound_file.samplerate
-                if duration < 0.2:  # Leopard has a minimum audio length
-                    print(f"🎤 Audio too short ({duration:.2f}s), skipping transcription.")
-                    return ""
+        duration = _wav_duration(audio_data)
+        if duration < 0.2:  # Leopard has a minimum audio length
+            print(f"🎤 Audio too short ({duration:.2f}s), skipping transcription.")
+            return ""
+        if _is_near_silent(audio_data, float(os.getenv("VAD_RMS_THRESHOLD", DEFAULT_RMS_THRESHOLD))):
+            print("🎤 Audio is only background noise, skipping transcription.")
+            return ""
     except Exception as e:
         print(f"Could not read audio duration: {e}. Skipping transcription.")
         return ""
     
     # Use the new on-device transcription
+    if _use_whisper():
+        from transcribe_whisper import transcribe_with_whisper
+        return transcribe_with_whisper(audio_data)
     from transcribe_leopard import transcribe_with_leopard
-    return transcribe_with_leopard(audio_data) 
\ No newline at end of file
+    return transcribe_with_leopard(audio_data)
+
+
+async def capture_and_transcribe_async(max_seconds: float = 15.0) -> str:
+    """
+    `capture_and_transcribe` for asyncio callers. Recording and transcription
+    run on a worker thread so they don't block the event loop.
+    """
+    return await asyncio.to_thread(capture_and_transcribe, max_seconds)
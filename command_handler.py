@@ -9,14 +9,22 @@ to `gpt-3.5-turbo`).
 from __future__ import annotations
 
 import os
-from typing import Dict, List
+import io
+import time
+import threading
+import contextvars
+import functools
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 import re
 import json
 from openai import OpenAI
 from speak import speak_sync
 from datetime import datetime
-from config import OPENAI_API_KEY
+import pytz
+from config import OPENAI_API_KEY, get_settings
 from tools import tools, available_functions
+from response_cache import EMBEDDING_MODEL, ResponseCache, normalize
 
 
 class RestartRequest(Exception):
@@ -26,6 +34,57 @@ class RestartRequest(Exception):
 
 client = OpenAI(api_key=OPENAI_API_KEY)
 
+def _embed(text: str) -> List[float]:
+    """Embedding used by the response cache's similarity fallback."""
+    return client.embeddings.create(model=EMBEDDING_MODEL, input=text).data[0].embedding
+
+
+_semantic_threshold = os.getenv("SEMANTIC_CACHE_THRESHOLD")
+response_cache = ResponseCache(
+    similarity_threshold=float(_semantic_threshold) if _semantic_threshold else None,
+    embed=_embed,
+)
+
+# Timezone for get_current_time when the model doesn't pass one; overridden by
+# "timezone" in settings.json or the DEFAULT_TIMEZONE environment variable.
+DEFAULT_TIMEZONE = "America/Los_Angeles"
+
+def _default_timezone() -> str:
+    return get_settings().get("timezone") or os.getenv("DEFAULT_TIMEZONE") or DEFAULT_TIMEZONE
+
+
+def _local_now() -> datetime:
+    try:
+        tz = pytz.timezone(_default_timezone())
+    except pytz.UnknownTimeZoneError:
+        tz = pytz.timezone(DEFAULT_TIMEZONE)
+    return datetime.now(tz)
+
+
+# The fast-path replies go straight to TTS, so they are phrased to be spoken:
+# no zone ids and no zero-padded numbers.
+def _spoken_time() -> str:
+    now = _local_now()
+    return f"It's {now.hour % 12 or 12}:{now:%M %p}."
+
+
+def _today() -> str:
+    now = _local_now()
+    return f"Today is {now:%A, %B} {now.day}, {now.year}."
+
+
+# Questions answered locally without an LLM round trip, matched against
+# normalize()d text (lowercase, no punctuation).
+_FAST_INTENTS: List[tuple[re.Pattern, Callable[[re.Match], str]]] = [
+    (re.compile(r"^(?:whats the time|what is the time|what time is it)(?: now| right now)?$"),
+     lambda match: _spoken_time()),
+    (re.compile(r"^(?:whats|what is) (?:the |todays )?date(?: today)?$|^what day is (?:it|today)$"),
+     lambda match: _today()),
+]
+
+# Exact phrases that restart the assistant, checked with one hash lookup.
+RESTART_COMMANDS = frozenset({"restart", "restart yourself", "restart the system", "system restart"})
+
 
 SYSTEM_PROMPT = {
     "role": "system",
@@ -52,86 +111,406 @@ SYSTEM_PROMPT = {
     )
 }
 
-def _ask_llm(messages: List[Dict[str, str]]):
+# Only the most recent user turns are sent verbatim; older turns are folded
+# into a rolling summary so the prompt stops growing with session length.
+HISTORY_WINDOW_TURNS = 6
+HISTORY_SUMMARY_MAX_CHARS = 2000
+_SUMMARY_PREFIX = "Summary of the earlier conversation:\n"
+
+# Once the raw summary grows past this, a small model condenses it in the background.
+HISTORY_CONDENSE_CHARS = 1200
+SUMMARY_MODEL = "gpt-4o-mini"
+_condensing = threading.Lock()
+# Guards rewrites of the summary slot (history[1]): compaction on the caller's
+# thread and the condenser's swap must not interleave.
+_history_lock = threading.Lock()
+
+# Every request shares the same tools + SYSTEM_PROMPT prefix, so one cache key
+# routes them all to the same prompt-cache shard.
+PROMPT_CACHE_KEY = "aerion-home-assistant"
+
+
+def _message_field(message, field: str):
+    """Reads a field from either a plain dict or an OpenAI message object."""
+    if isinstance(message, dict):
+        return message.get(field)
+    return getattr(message, field, None)
+
+
+def _compact_history(history: List[Dict[str, str]]) -> None:
+    """
+    Keeps the system prompt, a rolling summary message and the last
+    HISTORY_WINDOW_TURNS user turns (with their replies and tool calls).
+    Everything older is concatenated into the summary and truncated.
+    """
+    with _history_lock:
+        _compact_history_locked(history)
+
+
+def _compact_history_locked(history: List[Dict[str, str]]) -> None:
+    user_indices = [i for i, m in enumerate(history) if _message_field(m, "role") == "user"]
+    if len(user_indices) <= HISTORY_WINDOW_TURNS:
+        return
+    cutoff = user_indices[-HISTORY_WINDOW_TURNS]
+
+    start = 1
+    summary = ""
+    if len(history) > 1 and str(_message_field(history[1], "content") or "").startswith(_SUMMARY_PREFIX):
+        summary = history[1]["content"][len(_SUMMARY_PREFIX):]
+        start = 2
+
+    lines = [summary] if summary else []
+    for message in history[start:cutoff]:
+        role = _message_field(message, "role")
+        content = _message_field(message, "content")
+        if role in ("user", "assistant") and content:
+            lines.append(f"{role}: {content}")
+    summary = "\n".join(lines)[-HISTORY_SUMMARY_MAX_CHARS:]
+
+    # The summary sits right after the system prompt so the static prefix stays cacheable.
+    history[1:cutoff] = [{"role": "system", "content": _SUMMARY_PREFIX + summary}]
+
+
+def _condense_summary_async(history: List[Dict[str, str]]) -> None:
+    """
+    Rewrites a long rolling summary into a short one with SUMMARY_MODEL on a
+    background thread, so older turns keep their gist instead of being cut off
+    at HISTORY_SUMMARY_MAX_CHARS. The reply in progress is never delayed.
+    """
+    if len(history) < 2:
+        return
+    summary_message = history[1]
+    content = str(_message_field(summary_message, "content") or "")
+    if not content.startswith(_SUMMARY_PREFIX) or len(content) - len(_SUMMARY_PREFIX) < HISTORY_CONDENSE_CHARS:
+        return
+    if not _condensing.acquire(blocking=False):
+        return  # a condense is already running
+
+    def _run():
+        try:
+            response = client.chat.completions.create(
+                model=SUMMARY_MODEL,
+                messages=[
+                    {
+                        "role": "system",
+                        "content": "Condense this conversation log into a few short sentences. "
+                        "Keep names, dates, decisions and open requests. Output only the summary.",
+                    },
+                    {"role": "user", "content": content[len(_SUMMARY_PREFIX):]},
+                ],
+                max_tokens=300,
+            )
+            condensed = (response.choices[0].message.content or "").strip()
+            # Swap it in only if the summary wasn't rewritten meanwhile.
+            with _history_lock:
+                if condensed and len(history) > 1 and history[1] is summary_message:
+                    history[1] = {"role": "system", "content": _SUMMARY_PREFIX + condensed}
+        except Exception as e:
+            print(f"Could not condense conversation summary: {e}")
+        finally:
+            _condensing.release()
+
+    threading.Thread(target=_run, name="summary-condenser", daemon=True).start()
+
+
+def _log_cache_usage(response) -> None:
+    """
+    Prints how many prompt tokens were served from OpenAI's automatic prefix cache.
+    The cache only engages when the start of the prompt is byte-identical between
+    turns, which is why SYSTEM_PROMPT must stay static and always come first.
+    """
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    print(f"Prompt tokens: {usage.prompt_tokens} (cached: {cached_tokens})")
+
+
+# gpt-4o plans tool use and answers directly; the reply after tool calls only
+# verbalizes their results, which the smaller model does faster and cheaper.
+CHAT_MODEL = "gpt-4o"
+SYNTH_MODEL = os.getenv("AERION_SYNTH_MODEL", "gpt-4o-mini")
+
+# Tool results longer than this are cut down to their head and tail.
+MAX_TOOL_RESULT_CHARS = 4000
+
+
+def _compact_tool_response(content):
+    """
+    Caps a tool result at MAX_TOOL_RESULT_CHARS, keeping the start and end,
+    so an oversized result (e.g. web search snippets) can't inflate the follow-up prompt.
+    """
+    if not isinstance(content, str) or len(content) <= MAX_TOOL_RESULT_CHARS:
+        return content
+    keep = MAX_TOOL_RESULT_CHARS // 2
+    return f"{content[:keep]}\n...truncated {len(content) - 2 * keep} characters...\n{content[-keep:]}"
+
+
+# Tool results shorter than this are sent as-is even if repeated.
+MIN_DEDUPE_TOOL_CHARS = 200
+
+
+def _dedupe_tool_results(messages: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Returns the messages to send with any tool result that repeats an earlier
+    one (e.g. the same calendar listing fetched twice) replaced by a pointer to
+    the first call. The stored history keeps the full content.
+    """
+    first_call_by_content: Dict[str, str] = {}
+    deduped = []
+    for message in messages:
+        content = _message_field(message, "content")
+        if _message_field(message, "role") == "tool" and isinstance(content, str) and len(content) >= MIN_DEDUPE_TOOL_CHARS:
+            first_call = first_call_by_content.setdefault(content, message["tool_call_id"])
+            if first_call != message["tool_call_id"]:
+                message = {**message, "content": f"(Same result as tool call {first_call} above.)"}
+        deduped.append(message)
+    return deduped
+
+
+def _stream_completion(
+    messages: List[Dict[str, str]], on_text: Callable[[str], None] | None, model: str = CHAT_MODEL, **kwargs
+) -> Dict:
+    """
+    Runs a streamed chat completion and returns the assembled assistant message.
+    Content deltas are passed to *on_text* as they arrive; tool-call deltas are
+    stitched back together by index.
+    """
+    stream = client.chat.completions.create(
+        model=model,
+        messages=_dedupe_tool_results(messages),
+        tools=tools,
+        stream=True,
+        stream_options={"include_usage": True},
+        extra_body={"prompt_cache_key": PROMPT_CACHE_KEY},
+        **kwargs,
+    )
+    content: List[str] = []
+    tool_calls: Dict[int, Dict] = {}
+    for chunk in stream:
+        if chunk.usage is not None:
+            _log_cache_usage(chunk)
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+            if on_text is not None:
+                on_text(delta.content)
+        for call in delta.tool_calls or []:
+            slot = tool_calls.setdefault(
+                call.index, {"id": "", "type": "function", "function": {"name": "", "arguments": ""}}
+            )
+            if call.id:
+                slot["id"] = call.id
+            if call.function is not None:
+                slot["function"]["name"] += call.function.name or ""
+                slot["function"]["arguments"] += call.function.arguments or ""
+
+    message: Dict = {"role": "assistant", "content": "".join(content) or None}
+    if tool_calls:
+        message["tool_calls"] = [tool_calls[i] for i in sorted(tool_calls)]
+    return message
+
+
+# Tools that only read data, so several calls in one response can run at once.
+# Anything that sends, saves or navigates runs sequentially in model order.
+PARALLEL_SAFE_TOOLS = frozenset(
+    {"get_current_time", "search_web", "get_all_upcoming_events", "search_contacts", "get_my_profile"}
+)
+
+
+def _ask_llm(
+    messages: List[Dict[str, str]],
+    on_text: Callable[[str], None] | None = None,
+    temperature: Optional[float] = None,
+):
     """
     Handles the primary logic of sending a prompt to the LLM and getting a response.
     This function now supports tool calling and maintains conversation history.
+    Responses are streamed; pass *on_text* to receive the reply text as it is generated.
+    *temperature* overrides the model default for every completion in the turn.
     """
+    sampling = {} if temperature is None else {"temperature": temperature}
     try:
         # First, send the prompt to the model and see if it wants to use a tool.
-        response = client.chat.completions.create(
-            model="gpt-4o",
-            messages=messages,
-            tools=tools,
-            tool_choice="auto",
-        )
-        response_message = response.choices[0].message
-
-        tool_calls = response_message.tool_calls
+        response_message = _stream_completion(messages, on_text, tool_choice="auto", **sampling)
+
+        tool_calls = response_message.get("tool_calls")
         if tool_calls:
             print(f"LLM wants to call a tool: {tool_calls}")
             # The model wants to call a tool. Append its response to the message history.
             messages.append(response_message)
 
-            # Execute all tool calls.
-            for tool_call in tool_calls:
-                function_name = tool_call.function.name
-                function_to_call = available_functions[function_name]
-                function_args = json.loads(tool_call.function.arguments)
-                
-                # Special handling for get_current_time to default to a local timezone
-                if function_name == "get_current_time" and not function_args.get("timezone"):
-                    # TODO: Make this configurable or auto-detect from user's location
-                    function_args["timezone"] = "America/Los_Angeles" 
-                    print(f"Defaulting timezone to {function_args['timezone']}")
-
-                function_response = function_to_call(**function_args)
-                
-                # Append the function's response to the message history.
-                messages.append(
-                    {
-                        "tool_call_id": tool_call.id,
-                        "role": "tool",
-                        "name": function_name,
-                        "content": function_response,
-                    }
-                )
+            # Resolved once per turn, not per tool call.
+            default_timezone = _default_timezone()
+
+            # Execute all tool calls. Read-only calls in one response are independent,
+            # so they run concurrently and the turn waits for the slowest, not the sum.
+            # Each runs in a copy of the caller's context, so tools that read Flask's
+            # g/session (Google credentials) still see the request. Calls with side
+            # effects run here, one at a time, in the order the model gave them.
+            with ThreadPoolExecutor(max_workers=len(tool_calls)) as pool:
+                results = []  # a Future for reads, the pending call for side effects
+                for tool_call in tool_calls:
+                    function_name = tool_call["function"]["name"]
+                    function_to_call = available_functions[function_name]
+                    function_args = json.loads(tool_call["function"]["arguments"] or "{}")
+                    
+                    # Special handling for get_current_time to default to a local timezone
+                    if function_name == "get_current_time" and not function_args.get("timezone"):
+                        function_args["timezone"] = default_timezone
+                        print(f"Defaulting timezone to {function_args['timezone']}")
+
+                    if function_name in PARALLEL_SAFE_TOOLS:
+                        context = contextvars.copy_context()
+                        results.append(pool.submit(context.run, function_to_call, **function_args))
+                    else:
+                        results.append(functools.partial(function_to_call, **function_args))
+
+                # Side-effecting calls run now, in model order, while the reads finish.
+                for i, result in enumerate(results):
+                    if not isinstance(result, Future):
+                        results[i] = result()
+
+                # Append the function responses to the message history, in call order.
+                for tool_call, result in zip(tool_calls, results):
+                    messages.append(
+                        {
+                            "tool_call_id": tool_call["id"],
+                            "role": "tool",
+                            "name": tool_call["function"]["name"],
+                            "content": _compact_tool_response(
+                                result.result() if isinstance(result, Future) else result
+                            ),
+                        }
+                    )
             
             # Send the entire conversation back to the model for a final response.
             print("Sending tool results back to LLM for final response...")
-            final_response = client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
+            # This call only puts the tool results into words, so it uses the
+            # smaller SYNTH_MODEL. Tools stay in the request (but can't be called)
+            # so its prompt prefix is stable from turn to turn and stays cached.
+            final_message = _stream_completion(
+                messages, on_text, model=SYNTH_MODEL, tool_choice="none", **sampling
             )
             # Append the final response to the history before returning
-            messages.append(final_response.choices[0].message)
-            return final_response.choices[0].message.content
+            messages.append(final_message)
+            return final_message["content"]
 
         # If no tool is called, just return the content.
         # Append the response to the history as well
         messages.append(response_message)
-        return response_message.content
+        return response_message["content"]
 
     except Exception as e:
         print(f"Error communicating with OpenAI: {e}")
         return "Sorry, I'm having trouble connecting to my brain right now."
 
 
-def handle_command(text: str, history: List[Dict[str, str]]) -> str | None:
+BATCH_POLL_SECONDS = 60
+
+
+def ask_llm_batch(conversations: List[List[Dict[str, str]]], poll_seconds: float = BATCH_POLL_SECONDS) -> List[Optional[str]]:
+    """
+    Answers several tool-free conversations through OpenAI's Batch API, which
+    costs half as much as chat completions but may take up to 24 hours.
+    Only for background jobs; voice turns must keep using `_ask_llm`.
+    Blocks until the batch finishes. Returns one reply per conversation, in
+    order (None for requests that failed).
+    """
+    if not conversations:
+        return []
+
+    lines = [
+        json.dumps({
+            "custom_id": str(i),
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {"model": CHAT_MODEL, "messages": messages},
+        })
+        for i, messages in enumerate(conversations)
+    ]
+    batch_input = client.files.create(
+        file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))), purpose="batch"
+    )
+    batch = client.batches.create(
+        input_file_id=batch_input.id, endpoint="/v1/chat/completions", completion_window="24h"
+    )
+    print(f"Submitted LLM batch {batch.id} with {len(conversations)} requests.")
+
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        time.sleep(poll_seconds)
+        batch = client.batches.retrieve(batch.id)
+
+    replies: List[Optional[str]] = [None] * len(conversations)
+    if not batch.output_file_id:
+        print(f"LLM batch {batch.id} ended with status '{batch.status}' and no output.")
+        return replies
+
+    for line in client.files.content(batch.output_file_id).text.splitlines():
+        result = json.loads(line)
+        response = result.get("response") or {}
+        if response.get("status_code") == 200:
+            replies[int(result["custom_id"])] = response["body"]["choices"][0]["message"]["content"]
+    return replies
+
+
+def handle_command(
+    text: str, history: List[Dict[str, str]], on_text: Callable[[str], None] | None = None
+) -> str | None:
     """
     Processes the transcribed text, maintaining conversation history.
     First checks for special hard-coded commands like 'restart'.
+    *on_text* receives the reply incrementally while it streams in.
     """
     normalized_text = text.strip().lower()
-    if normalized_text in ("restart", "restart yourself", "restart the system", "system restart"):
+    if normalized_text in RESTART_COMMANDS:
         print("💡 User requested restart.")
         raise RestartRequest()
 
+    # Keep the static system prompt as the first message so the prompt prefix
+    # stays identical across turns and OpenAI's prompt cache can reuse it.
+    if not history or history[0] != SYSTEM_PROMPT:
+        history.insert(0, SYSTEM_PROMPT)
+
     # Append the new user message to the history
     history.append({"role": "user", "content": text})
+    _compact_history(history)
     
     print(f"Handling command: '{text}'")
-    
-    # Pass the entire history to the LLM
-    response = _ask_llm(history)
+
+    intent_text = normalize(text)
+    for pattern, answer in _FAST_INTENTS:
+        if (match := pattern.match(intent_text)):
+            reply = answer(match)
+            print(f"⚡ Answered locally: '{reply}'")
+            history.append({"role": "assistant", "content": reply})
+            if on_text is not None:
+                on_text(reply)
+            return reply
+
+    # A question with no earlier turns has no context to depend on, so it can
+    # be answered from the response cache.
+    one_shot = len(history) == 2
+    if one_shot and (cached := response_cache.get(text)) is not None:
+        print(f"💾 Response cache hit for '{text}'")
+        history.append({"role": "assistant", "content": cached})
+        if on_text is not None:
+            on_text(cached)
+        return cached
+
+    # Pass the entire history to the LLM. One-shot questions are answered at
+    # temperature 0, so a cached reply is the one the model would give again
+    # rather than a single sample frozen for the cache's lifetime.
+    history_length = len(history)
+    response = _ask_llm(history, on_text, temperature=0 if one_shot else None)
+
+    # Only deterministic, plain replies are cached; anything that went through
+    # tools depends on live data.
+    if one_shot and response and len(history) == history_length + 1:
+        response_cache.set(text, response)
+
+    _condense_summary_async(history)
     return response
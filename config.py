@@ -1,4 +1,5 @@
 import os
+import json
 from dotenv import load_dotenv
 
 # Load environment variables from a .env file
@@ -14,4 +15,29 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 # --- Audio Settings ---
-VAD_RMS_THRESHOLD = float(os.getenv("VAD_RMS_THRESHOLD", 0.02)) # Threshold for voice activity detection 
\ No newline at end of file
+VAD_RMS_THRESHOLD = float(os.getenv("VAD_RMS_THRESHOLD", 0.02)) # Threshold for voice activity detection
+
+# --- User Settings ---
+# settings.json is written by the web UI and read on every utterance, so the
+# parsed contents are cached until the file's modification time or size changes.
+SETTINGS_FILE = 'settings.json'
+_settings_cache: dict = {"stamp": None, "data": {}}
+
+
+def get_settings() -> dict:
+    """Returns the parsed settings file, or an empty dict if it is missing or unreadable."""
+    try:
+        st = os.stat(SETTINGS_FILE)
+    except FileNotFoundError:
+        return {}
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    if _settings_cache["stamp"] != stamp:
+        try:
+            with open(SETTINGS_FILE, 'r') as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}  # mid-write or removed; try again next time
+        _settings_cache["stamp"] = stamp
+        _settings_cache["data"] = data
+    return _settings_cache["data"]
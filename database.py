@@ -1,9 +1,17 @@
+import atexit
+import queue
+import threading
+import time
 from typing import Optional
 
 import httpx
 from supabase import create_client, Client
 from config import SUPABASE_URL, SUPABASE_KEY
 
+# Idle connections to Supabase are reused for this long; requests give up after the timeout.
+SUPABASE_KEEPALIVE_SECONDS = 120.0
+SUPABASE_TIMEOUT_SECONDS = 5.0
+
 supabase: Optional[Client] = None
 if SUPABASE_URL and SUPABASE_KEY:
     try:
@@ -15,17 +23,25 @@ if SUPABASE_URL and SUPABASE_KEY:
         
         # The default httpx client can have issues with HTTP/2 on macOS.
         # To fix this, we create a new client with HTTP/2 disabled and
-        # replace the one used by the postgrest client.
+        # replace the one used by the postgrest client. Its connection is kept
+        # alive between conversation turns, which are usually more than httpx's
+        # default 5 s keep-alive apart, so each log write skips the TLS handshake.
         if supabase.postgrest is not None and hasattr(supabase.postgrest, 'session'):
              original_session = supabase.postgrest.session
              base_url = original_session.base_url
              headers = original_session.headers
-             transport = httpx.HTTPTransport(http2=False)
+             transport = httpx.HTTPTransport(
+                 http2=False,
+                 retries=1,
+                 limits=httpx.Limits(max_connections=4, max_keepalive_connections=2, keepalive_expiry=SUPABASE_KEEPALIVE_SECONDS),
+             )
              supabase.postgrest.session = httpx.Client(
                  base_url=base_url,
                  headers=headers,
                  transport=transport,
+                 timeout=httpx.Timeout(SUPABASE_TIMEOUT_SECONDS),
              )
+             original_session.close()
 
         print("Successfully connected to Supabase.")
     except Exception as e:
@@ -34,25 +50,86 @@ else:
     print("Supabase credentials not found. Database logging will be disabled.")
 
 
+# Sessions and messages are written in order by a single background thread
+# so the Supabase round-trips stay off the conversation loop.
+MAX_LOG_BATCH = 32
+LOG_BATCH_WINDOW_SECONDS = 0.5  # how long a batch waits for more records before it is written
+_log_queue: "queue.Queue[tuple[str, dict]]" = queue.Queue()
+_log_writer: Optional[threading.Thread] = None
+_log_writer_lock = threading.Lock()
+
+
+def _write_records(table: str, records: list):
+    """Writes a batch of records for one table in a single request."""
+    try:
+        if table == "chat_sessions":
+            supabase.table(table).upsert(records, returning="minimal").execute()
+        else:
+            supabase.table(table).insert(records).execute()
+    except Exception as e:
+        print(f"Error writing to Supabase table '{table}': {e}")
+
+
+def _log_writer_loop():
+    """
+    Drains the log queue, writing consecutive records for the same table as
+    one batch. A batch collects records for up to LOG_BATCH_WINDOW_SECONDS
+    (or MAX_LOG_BATCH records); a record for a different table ends the batch
+    and starts the next.
+    """
+    pending = None
+    while True:
+        table, record = pending or _log_queue.get()
+        pending = None
+        records = [record]
+        deadline = time.monotonic() + LOG_BATCH_WINDOW_SECONDS
+        while len(records) < MAX_LOG_BATCH:
+            try:
+                item = _log_queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                break
+            if item[0] != table:
+                pending = item
+                break
+            records.append(item[1])
+        _write_records(table, records)
+        for _ in records:
+            _log_queue.task_done()
+
+
+def _ensure_log_writer():
+    """Starts the background writer thread on first use."""
+    global _log_writer
+    with _log_writer_lock:
+        if _log_writer is None:
+            _log_writer = threading.Thread(target=_log_writer_loop, name="supabase-log-writer", daemon=True)
+            _log_writer.start()
+
+
+def flush_messages():
+    """Blocks until every queued message has been written."""
+    if _log_writer is not None:
+        _log_queue.join()
+
+
+atexit.register(flush_messages)
+
+
 def create_chat_session(session_id: int):
     """
-    Creates a new record in the 'chat_sessions' table.
-    Uses upsert to avoid errors if the session already exists.
+    Queues a new record for the 'chat_sessions' table and returns immediately.
+    Uses upsert to avoid errors if the session already exists. The session is
+    always written before any message queued after this call.
     """
     if not supabase:
         return
-    try:
-        supabase.table("chat_sessions").upsert(
-            {"id": session_id, "name": "Voice Chat", "user_id": 2},
-            returning="minimal",
-        ).execute()
-    except Exception as e:
-        print(f"Error creating chat session in Supabase: {e}")
+    _ensure_log_writer()
+    _log_queue.put(("chat_sessions", {"id": session_id, "name": "Voice Chat", "user_id": 2}))
 
 
 def log_message(session_id: int, content: str, direction: str):
     """
-    Logs a message to the Supabase 'messages' table.
+    Queues a message for the Supabase 'messages' table and returns immediately.
     Assumes the chat session has already been created.
     """
     if not supabase:
@@ -71,8 +148,9 @@ def log_message(session_id: int, content: str, direction: str):
             "is_handled": True,
             "message_type": "conversation",
         }
-        
-        data, count = supabase.table("messages").insert(record).execute()
+
+        _ensure_log_writer()
+        _log_queue.put(("messages", record))
 
     except Exception as e:
         print(f"Error logging message to Supabase: {e}")
\ No newline at end of file
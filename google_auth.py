@@ -1,14 +1,19 @@
 import os
 import json
+import functools
+import hashlib
+import threading
+from collections import OrderedDict
 from typing import Optional
-from flask import session # Import session
+import requests
+from flask import g, session # Import session
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import Flow
 from google.auth.transport.requests import Request
 from googleapiclient.discovery import build
 
 # Define the scopes for the Google APIs you want to access
-SCOPES = [
+SCOPES = tuple(sorted([ # Sorted to ensure consistent order; a tuple so it can't be mutated
     "openid",
     "https://www.googleapis.com/auth/calendar.readonly",
     "https://www.googleapis.com/auth/contacts.readonly",
@@ -16,40 +21,52 @@ SCOPES = [
     "https://www.googleapis.com/auth/userinfo.profile",
     "https://www.googleapis.com/auth/userinfo.email",
     "https://www.googleapis.com/auth/gmail.modify",
-]
-SCOPES.sort() # Sort scopes to ensure consistent order
+]))
 CREDENTIALS_FILE = 'credentials.json' # Still needed for local fallback
 
+# User info per access token. get_auth_status runs several times per page
+# (route + template context), and the profile doesn't change within a token's life.
+USER_INFO_CACHE_SIZE = 8
+_user_info_cache: "OrderedDict[str, dict]" = OrderedDict()
+_user_info_lock = threading.Lock()  # Flask serves requests on several threads
+
+# Token refreshes go through one pooled requests.Session so the TLS connection
+# to oauth2.googleapis.com is reused instead of re-handshaken on every refresh.
+_refresh_request: Optional[Request] = None
+_refresh_request_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=1)
+def _parse_client_config(creds_json_str: str) -> dict:
+    """Parses GOOGLE_CREDENTIALS_JSON once; later flows reuse the parsed config."""
+    try:
+        return json.loads(creds_json_str)
+    except json.JSONDecodeError:
+        raise ValueError("Failed to parse GOOGLE_CREDENTIALS_JSON.")
+
 def get_google_flow(redirect_uri: str) -> Flow:
     """
     Creates a Google OAuth Flow object from an environment variable or a local file.
     """
-    client_config = None
     creds_json_str = os.environ.get('GOOGLE_CREDENTIALS_JSON')
 
     if creds_json_str:
-        try:
-            client_config = json.loads(creds_json_str)
-        except json.JSONDecodeError:
-            raise ValueError("Failed to parse GOOGLE_CREDENTIALS_JSON.")
-        
-        flow = Flow.from_client_config(
+        client_config = _parse_client_config(creds_json_str)
+        return Flow.from_client_config(
             client_config,
             scopes=SCOPES,
             redirect_uri=redirect_uri
         )
-    elif os.path.exists(CREDENTIALS_FILE):
-        flow = Flow.from_client_secrets_file(
+
+    try:
+        return Flow.from_client_secrets_file(
             CREDENTIALS_FILE,
             scopes=SCOPES,
             redirect_uri=redirect_uri
         )
-    else:
+    except FileNotFoundError:
         raise FileNotFoundError(
             f"Neither '{CREDENTIALS_FILE}' not found, nor 'GOOGLE_CREDENTIALS_JSON' env var set."
         )
-    
-    return flow
 
 def get_auth_url(redirect_uri: str) -> str:
     """Generates the Google Authentication URL for the user to visit."""
@@ -69,6 +86,7 @@ def process_auth_callback(code: str, redirect_uri: str) -> bool:
         
         # Instead of saving to a file, save to the session cookie
         session['google_credentials'] = json.loads(creds.to_json())
+        g.pop('google_credentials', None)
         return True
     except Exception as e:
         print(f"Error processing auth callback: {e}")
@@ -78,7 +96,16 @@ def get_credentials() -> Optional[Credentials]:
     """
     Gets user credentials from the session.
     Refreshes the token if it's expired.
+    The parsed Credentials are kept on `flask.g`, so repeated calls within one
+    request (e.g. several tool calls) skip the session decode and parsing.
     """
+    if 'google_credentials' in g:
+        return g.google_credentials
+    g.google_credentials = _load_credentials()
+    return g.google_credentials
+
+def _load_credentials() -> Optional[Credentials]:
+    """Builds Credentials from the session cookie, refreshing them if expired."""
     creds_info = session.get('google_credentials')
     if not creds_info:
         return None
@@ -87,7 +114,7 @@ def get_credentials() -> Optional[Credentials]:
     
     if creds and creds.expired and creds.refresh_token:
         try:
-            creds.refresh(Request())
+            creds.refresh(_get_refresh_request())
             # Save the refreshed credentials back to the session
             session['google_credentials'] = json.loads(creds.to_json())
         except Exception as e:
@@ -97,6 +124,35 @@ def get_credentials() -> Optional[Credentials]:
             
     return creds
 
+def _get_refresh_request() -> Request:
+    """Returns the shared transport used to refresh access tokens."""
+    global _refresh_request
+    with _refresh_request_lock:
+        if _refresh_request is None:
+            _refresh_request = Request(session=requests.Session())
+        return _refresh_request
+
+def _get_user_info(creds: Credentials) -> dict:
+    """
+    Returns the signed-in user's profile, building the oauth2 service and
+    calling userinfo only once per access token.
+    """
+    key = hashlib.sha256(creds.token.encode()).hexdigest()
+    with _user_info_lock:
+        user_info = _user_info_cache.get(key)
+        if user_info is not None:
+            _user_info_cache.move_to_end(key)
+            return user_info
+
+    # The userinfo call runs outside the lock so one slow request doesn't block the others
+    service = build('oauth2', 'v2', credentials=creds, cache_discovery=False)
+    user_info = service.userinfo().get().execute()
+    with _user_info_lock:
+        _user_info_cache[key] = user_info
+        if len(_user_info_cache) > USER_INFO_CACHE_SIZE:
+            _user_info_cache.popitem(last=False)
+    return user_info
+
 def get_auth_status() -> dict:
     """
     Checks the current authentication status and returns user info if available.
@@ -104,8 +160,7 @@ def get_auth_status() -> dict:
     creds = get_credentials()
     if creds and creds.valid:
         try:
-            service = build('oauth2', 'v2', credentials=creds, cache_discovery=False)
-            user_info = service.userinfo().get().execute()
+            user_info = _get_user_info(creds)
             return {
                 "status": "authenticated",
                 "email": user_info.get("email"),
@@ -119,6 +174,9 @@ def get_auth_status() -> dict:
 
 def revoke_auth() -> bool:
     """Revokes access by clearing the credentials from the session."""
+    g.pop('google_credentials', None)
+    with _user_info_lock:
+        _user_info_cache.clear()
     if 'google_credentials' in session:
         session.pop('google_credentials', None)
         return True
@@ -1,8 +1,13 @@
 import datetime
+import functools
+import hashlib
 import os.path
 import json
+import operator
+import time
 
-from googleapiclient.discovery import build
+from googleapiclient import discovery_cache
+from googleapiclient.discovery import build, build_from_document
 from googleapiclient.errors import HttpError
 from google_auth import get_credentials # Use the new auth module
 
@@ -15,6 +20,29 @@ SCOPES = [
     "https://www.googleapis.com/auth/gmail.modify",
 ]
 
+# Partial-response masks: Google only sends the fields the helpers below use.
+CALENDAR_LIST_FIELDS = "items(id,summary)"
+EVENT_LIST_FIELDS = "items(summary,start)"
+
+# timeMin for event queries; 'Z' indicates UTC time.
+RFC3339_UTC_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+# The set of calendars rarely changes, so it is reused for this long per account.
+CALENDAR_LIST_TTL_SECONDS = 600
+_calendar_list_cache: dict = {}  # account key -> (fetched_at, items)
+
+# Google caps a batch HTTP request at 50 calls (Calendar) / 100 calls (other APIs).
+MAX_BATCH_REQUESTS = 50
+
+
+@functools.lru_cache(maxsize=None)
+def _discovery_document(service_name: str, version: str):
+    """
+    The discovery document bundled with googleapiclient for an API, read from
+    disk once per process. None if the library doesn't ship one.
+    """
+    return discovery_cache.get_static_doc(service_name, version)
+
 
 def get_google_service(service_name: str, version: str):
     """
@@ -29,8 +57,10 @@ def get_google_service(service_name: str, version: str):
         return None
     
     try:
-        service = build(service_name, version, credentials=creds)
-        return service
+        document = _discovery_document(service_name, version)
+        if document is None:
+            return build(service_name, version, credentials=creds, cache_discovery=False)
+        return build_from_document(document, credentials=creds)
     except HttpError as error:
         print(f"An error occurred: {error}")
         return None
@@ -47,6 +77,23 @@ def get_gmail_service():
     """Returns an authenticated Gmail service object."""
     return get_google_service("gmail", "v1")
 
+def _get_calendar_list(service) -> list:
+    """
+    Returns the user's calendars (id and summary), fetching them at most once
+    per CALENDAR_LIST_TTL_SECONDS for each signed-in account.
+    """
+    creds = get_credentials()
+    account = (creds.refresh_token or creds.token) if creds else ""
+    key = hashlib.sha256(account.encode()).hexdigest()
+
+    cached = _calendar_list_cache.get(key)
+    if cached is not None and time.monotonic() - cached[0] < CALENDAR_LIST_TTL_SECONDS:
+        return cached[1]
+
+    items = service.calendarList().list(fields=CALENDAR_LIST_FIELDS).execute().get("items", [])
+    _calendar_list_cache[key] = (time.monotonic(), items)
+    return items
+
 def list_calendars():
     """Lists all the user's calendars."""
     service = get_calendar_service()
@@ -54,8 +101,7 @@ def list_calendars():
         return "Could not connect to Google Calendar."
     
     try:
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get("items", [])
+        calendars = _get_calendar_list(service)
         if not calendars:
             return "No calendars found."
         
@@ -76,7 +122,7 @@ def get_upcoming_events(max_results=10, calendar_id="primary"):
     if not service:
         return "Could not connect to Google Calendar."
         
-    now = datetime.datetime.utcnow().isoformat() + "Z"  # 'Z' indicates UTC time
+    now = datetime.datetime.now(datetime.timezone.utc).strftime(RFC3339_UTC_FORMAT)
     print(f"Getting upcoming {max_results} events")
     try:
         events_result = (
@@ -87,6 +133,7 @@ def get_upcoming_events(max_results=10, calendar_id="primary"):
                 maxResults=max_results,
                 singleEvents=True,
                 orderBy="startTime",
+                fields=EVENT_LIST_FIELDS,
             )
             .execute()
         )
@@ -119,52 +166,50 @@ def get_all_upcoming_events(max_results_per_calendar=5):
 
     try:
         # 1. Get list of all calendars
-        calendar_list = service.calendarList().list().execute()
-        calendars = calendar_list.get("items", [])
+        calendars = _get_calendar_list(service)
         if not calendars:
             return "No calendars found."
 
         all_events = []
-        now = datetime.datetime.utcnow().isoformat() + "Z"
-
-        # 2. Loop through each calendar and get events
-        for cal in calendars:
-            calendar_id = cal["id"]
-            calendar_summary = cal["summary"]
-            events_result = (
-                service.events()
-                .list(
-                    calendarId=calendar_id,
-                    timeMin=now,
-                    maxResults=max_results_per_calendar,
-                    singleEvents=True,
-                    orderBy="startTime",
+        now = datetime.datetime.now(datetime.timezone.utc).strftime(RFC3339_UTC_FORMAT)
+        summaries = {str(i): cal["summary"] for i, cal in enumerate(calendars)}
+
+        def _collect(request_id, response, exception):
+            if exception is not None:
+                print(f"Could not fetch events for calendar '{summaries[request_id]}': {exception}")
+                return
+            for event in response.get("items", []):
+                # Build the record the LLM sees straight away, with the calendar for context
+                all_events.append({
+                    "summary": event["summary"],
+                    "start": event["start"].get("dateTime", event["start"].get("date")),
+                    "calendar": summaries[request_id],
+                })
+
+        # 2. Get events for every calendar in one batch request instead of one round trip each
+        for start in range(0, len(calendars), MAX_BATCH_REQUESTS):
+            batch = service.new_batch_http_request(callback=_collect)
+            for i, cal in enumerate(calendars[start:start + MAX_BATCH_REQUESTS], start):
+                batch.add(
+                    service.events().list(
+                        calendarId=cal["id"],
+                        timeMin=now,
+                        maxResults=max_results_per_calendar,
+                        singleEvents=True,
+                        orderBy="startTime",
+                        fields=EVENT_LIST_FIELDS,
+                    ),
+                    request_id=str(i),
                 )
-                .execute()
-            )
-            events = events_result.get("items", [])
-            for event in events:
-                # Add calendar info to each event for context
-                event["calendar_summary"] = calendar_summary
-                all_events.append(event)
+            batch.execute()
 
         if not all_events:
             return "No upcoming events found across all calendars."
 
         # 3. Sort all collected events by start time
-        all_events.sort(key=lambda x: x["start"].get("dateTime", x["start"].get("date")))
+        all_events.sort(key=operator.itemgetter("start"))
 
-        # 4. Format for the LLM
-        event_list = []
-        for event in all_events:
-            start = event["start"].get("dateTime", event["start"].get("date"))
-            event_list.append({
-                "summary": event["summary"],
-                "start": start,
-                "calendar": event["calendar_summary"]
-            })
-
-        return json.dumps(event_list)
+        return json.dumps(all_events)
 
     except HttpError as error:
         return f"An error occurred: {error}" 
\ No newline at end of file
@@ -22,8 +22,8 @@ import argparse
 import socketio
 
 from command_handler import handle_command, SYSTEM_PROMPT, RestartRequest
-from audio_in import capture_and_transcribe, listen_for_speech
-from speak import speak_async, stop_speaking
+from audio_in import capture_and_transcribe, listen_for_barge_in, prewarm_transcriber
+from speak import SentenceStream, speak_async, stop_speaking
 from wake_word_listener import listen_for_wake_word
 from database import log_message, create_chat_session
 from socket_client import sio # Import the client from the new module
@@ -72,8 +72,15 @@ def main_loop():
 
         log_message(session_id=session_id, content=user_input, direction="outbound")
 
-        # Get response from LLM
-        response = handle_command(user_input, conversation_history)
+        # Speak the response as it streams in from the LLM, sentence by sentence
+        reply = SentenceStream()
+        speaking_thread = speak_async(reply)
+        try:
+            response = handle_command(user_input, conversation_history, on_text=reply.feed)
+            if response and not reply.has_text:
+                reply.feed(response)  # e.g. the error message, which is not streamed
+        finally:
+            reply.close()
         
         if not response:
             print("LLM returned no response. Listening again.")
@@ -81,8 +88,7 @@ def main_loop():
 
         log_message(session_id=session_id, content=response, direction="inbound")
 
-        # Speak the response and listen for barge-in
-        speaking_thread = speak_async(response)
+        # Listen for barge-in while the response is spoken
         if not speaking_thread:
             # This can happen if a TTS method that doesn't support threading is used.
             # In this case, we can't do barge-in, so we just wait for it to finish implicitly.
@@ -90,14 +96,11 @@ def main_loop():
 
         # --- Barge-in Logic ---
         time.sleep(0.2)  # Grace period for TTS audio to start playing.
-        interrupted = False
-        while speaking_thread.is_alive():
-            if listen_for_speech(timeout=0.1): # Check for speech every 100ms
-                print("🎤 Barge-in detected! Stopping TTS...")
-                stop_speaking()
-                interrupted = True
-                break
-            time.sleep(0.1)
+        # One microphone stream stays open until playback ends or the user talks over it
+        interrupted = listen_for_barge_in(speaking_thread.is_alive)
+        if interrupted:
+            print("🎤 Barge-in detected! Stopping TTS...")
+            stop_speaking()
 
         speaking_thread.join() # Wait for the thread to finish cleanly
 
@@ -116,6 +119,9 @@ if __name__ == "__main__":
     except socketio.exceptions.ConnectionError as e:
         print(f"Could not connect to Socket.IO server: {e}")
 
+    # Load the speech-to-text model while we wait for the wake word
+    prewarm_transcriber()
+
     # This loop provides crash protection. The script is started/stopped by the web_ui.py process.
     while True:
         try:
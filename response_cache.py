@@ -0,0 +1,120 @@
+"""response_cache.py
+Cache of assistant replies for repeated one-shot questions.
+
+Lookups match on normalized text (case, punctuation and spacing ignored).
+If `SEMANTIC_CACHE_THRESHOLD` is set (e.g. 0.92), a miss falls back to cosine
+similarity over OpenAI `text-embedding-3-small` embeddings. That costs one
+embedding request per lookup, so it is off by default.
+"""
+from __future__ import annotations
+
+import re
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import numpy as np  # type: ignore
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_TTL_SECONDS = 6 * 60 * 60
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+_NON_WORD = re.compile(r"[^\w\s]")
+
+
+def normalize(text: str) -> str:
+    """Lowercases and strips punctuation/extra whitespace from a transcript."""
+    return " ".join(_NON_WORD.sub("", text.lower()).split())
+
+
+class ResponseCache:
+    """
+    LRU cache of replies keyed by normalized question text, with an optional
+    embedding-similarity fallback. Entries expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        ttl: float = DEFAULT_TTL_SECONDS,
+        similarity_threshold: Optional[float] = None,
+        embed: Optional[Callable[[str], np.ndarray]] = None,
+    ):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity_threshold = similarity_threshold if embed is not None else None
+        self._embed = embed
+        # key -> (reply, created_at, unit-length embedding or None)
+        self._entries: "OrderedDict[str, tuple[str, float, Optional[np.ndarray]]]" = OrderedDict()
+        self._matrix: Optional[np.ndarray] = None  # stacked embeddings, rebuilt after changes
+        self._matrix_keys: list[str] = []
+        self._last_query: tuple[str, Optional[np.ndarray]] = ("", None)
+
+    def get(self, text: str) -> Optional[str]:
+        """Returns the cached reply for *text*, or None on a miss."""
+        key = normalize(text)
+        if not key:
+            return None
+        self._expire()
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            return entry[0]
+
+        if self.similarity_threshold is None:
+            return None
+        query = self._embedding(key)
+        if query is None:
+            return None
+        matrix = self._similarity_matrix()
+        if matrix is None:
+            return None
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        if scores[best] < self.similarity_threshold:
+            return None
+        hit = self._matrix_keys[best]
+        self._entries.move_to_end(hit)
+        return self._entries[hit][0]
+
+    def set(self, text: str, reply: str) -> None:
+        """Stores *reply* for *text*, evicting the least recently used entry if full."""
+        key = normalize(text)
+        if not key or not reply:
+            return
+        embedding = self._embedding(key) if self.similarity_threshold is not None else None
+        self._entries[key] = (reply, time.monotonic(), embedding)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        self._matrix = None
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.ttl
+        stale = [key for key, (_, created, _) in self._entries.items() if created < cutoff]
+        for key in stale:
+            del self._entries[key]
+        if stale:
+            self._matrix = None
+
+    def _embedding(self, key: str) -> Optional[np.ndarray]:
+        """Embeds *key* as a unit vector; the last query is reused by the following set()."""
+        if self._last_query[0] == key:
+            return self._last_query[1]
+        try:
+            vector = np.asarray(self._embed(key), dtype=np.float32)  # type: ignore[misc]
+            vector /= np.linalg.norm(vector) or 1.0
+        except Exception as e:
+            print(f"Response cache embedding failed: {e}")
+            vector = None
+        self._last_query = (key, vector)
+        return vector
+
+    def _similarity_matrix(self) -> Optional[np.ndarray]:
+        if self._matrix is None:
+            self._matrix_keys = [key for key, (_, _, emb) in self._entries.items() if emb is not None]
+            if not self._matrix_keys:
+                return None
+            self._matrix = np.stack([self._entries[key][2] for key in self._matrix_keys])
+        return self._matrix
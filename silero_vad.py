@@ -0,0 +1,73 @@
+"""silero_vad.py
+Optional Silero VAD backend running the ONNX model through onnxruntime.
+
+`SileroVad` exposes the same `is_speech(buf, sample_rate)` call as
+`webrtcvad.Vad`, so audio_in can use it as a drop-in replacement. Set
+`SILERO_VAD_MODEL` to the model path to enable it. An int8 model can be
+produced once with:
+
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    quantize_dynamic("silero_vad.onnx", "silero_vad_int8.onnx", weight_type=QuantType.QUInt8)
+"""
+from __future__ import annotations
+
+import numpy as np  # type: ignore
+
+try:
+    import onnxruntime as ort  # type: ignore
+except ImportError:  # pragma: no cover
+    ort = None  # type: ignore
+
+SAMPLE_RATE = 16_000
+WINDOW_SAMPLES = 512  # Silero scores fixed 512-sample windows at 16 kHz
+CONTEXT_SAMPLES = 64  # tail of the previous window prepended to each new one
+DEFAULT_THRESHOLD = 0.5
+
+
+class SileroVad:
+    """Streaming Silero VAD. Audio is buffered until a full window is available."""
+
+    def __init__(self, model_path: str, threshold: float = DEFAULT_THRESHOLD, num_threads: int = 2):
+        if ort is None:
+            raise ImportError("onnxruntime is required for the Silero VAD backend.")
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = num_threads
+        options.inter_op_num_threads = 1
+        self._session = ort.InferenceSession(
+            model_path, sess_options=options, providers=["CPUExecutionProvider"]
+        )
+        self._sample_rate = np.array(SAMPLE_RATE, dtype=np.int64)
+        self.threshold = threshold
+        self.reset()
+
+    def reset(self) -> None:
+        """Clears the recurrent state and any buffered audio."""
+        self._state = np.zeros((2, 1, 128), dtype=np.float32)
+        self._context = np.zeros((1, CONTEXT_SAMPLES), dtype=np.float32)
+        self._pending = np.zeros(0, dtype=np.float32)
+        self._speech = False
+
+    def is_speech(self, buf, sample_rate: int) -> bool:
+        """
+        Feeds a block of 16-bit PCM and returns the decision for the most
+        recently completed window (or the previous decision if none completed).
+        """
+        if sample_rate != SAMPLE_RATE:
+            raise ValueError(f"Silero VAD backend only supports {SAMPLE_RATE} Hz audio.")
+
+        samples = np.frombuffer(buf, dtype=np.int16).astype(np.float32) / 32768.0
+        self._pending = np.concatenate((self._pending, samples))
+
+        while len(self._pending) >= WINDOW_SAMPLES:
+            window = self._pending[:WINDOW_SAMPLES].reshape(1, -1)
+            self._pending = self._pending[WINDOW_SAMPLES:]
+
+            x = np.concatenate((self._context, window), axis=1)
+            prob, self._state = self._session.run(
+                None, {"input": x, "state": self._state, "sr": self._sample_rate}
+            )
+            self._context = x[:, -CONTEXT_SAMPLES:]
+            self._speech = float(prob[0][0]) >= self.threshold
+
+        return self._speech
@@ -17,10 +17,15 @@ import subprocess
 import sys
 import os
 import io
-import json
-from typing import NoReturn, Optional
+import importlib.util
+import re
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Iterable, NoReturn, Optional, Union
 import threading
 
+from config import get_settings
+
 # OpenAI client for TTS
 try:
     from openai import OpenAI  # type: ignore
@@ -41,6 +46,7 @@ except ImportError:  # pragma: no cover
 _engine = None  # pyttsx3 engine instance (optional)
 _process: Optional[subprocess.Popen] = None  # subprocess handle for say/espeak
 _lock = threading.Lock()
+_stop_event = threading.Event()  # set by stop_speaking() to halt the current utterance
 
 # Default voice name if VOICE_NAME not supplied
 DEFAULT_VOICE = "4YYIPFl9wE5c4L2eu2Gb"
@@ -48,14 +54,14 @@ DEFAULT_VOICE = "4YYIPFl9wE5c4L2eu2Gb"
 # OpenAI voice choices
 _OPENAI_VOICES = {"alloy", "echo", "fable", "onyx", "nova", "shimmer"}
 
+# Number of sentences synthesized ahead of playback.
+TTS_PIPELINE_DEPTH = 3
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
 
 def _get_current_settings():
     """Reads settings from the settings file, returns empty dict if not found."""
-    try:
-        with open('settings.json', 'r') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return {}
+    return get_settings()
 
 def _current_voice() -> str:
     """
@@ -71,6 +77,14 @@ def stop_speaking() -> None:
     with _lock:
         global _process, _engine
 
+        # Stop the sentence pipeline and any sounddevice playback
+        _stop_event.set()
+        try:
+            import sounddevice as sd  # type: ignore
+            sd.stop()
+        except Exception:
+            pass
+
         # Stop pyttsx3
         try:
             if _engine is not None:
@@ -87,8 +101,179 @@ def stop_speaking() -> None:
         _process = None
 
 
-def _speak_pyttsx3_async(text: str) -> threading.Thread | None:
-    """Speak via pyttsx3 in a background thread."""
+def _new_utterance() -> threading.Event:
+    """Starts a new utterance with its own stop flag and returns it."""
+    global _stop_event
+    with _lock:
+        _stop_event = threading.Event()
+        return _stop_event
+
+
+class SpeechTask:
+    """
+    Handle for an utterance queued on the speech worker.
+    Exposes the `is_alive()`/`join()` subset of `threading.Thread` that callers use.
+    """
+
+    def __init__(self, speak: Callable[[], object], stop_event: threading.Event):
+        self._speak = speak
+        self.stop_event = stop_event
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        try:
+            if not self.stop_event.is_set():
+                self._speak()
+        except Exception as exc:
+            print(f"[TTS worker error] {exc}")
+        finally:
+            self._done.set()
+
+    def is_alive(self) -> bool:
+        return not self._done.is_set()
+
+    def join(self, timeout: float | None = None) -> None:
+        self._done.wait(timeout)
+
+
+# A single long-lived worker plays queued utterances in order.
+_speech_queue: "queue.Queue[SpeechTask]" = queue.Queue()
+_speech_worker: Optional[threading.Thread] = None
+
+
+# Sentences are synthesized ahead of playback on one shared pool, also created
+# once. The extra slot runs the task that feeds sentences in from the reply.
+_synthesis_pool = ThreadPoolExecutor(max_workers=TTS_PIPELINE_DEPTH + 1, thread_name_prefix="tts-synth")
+
+
+def _speech_worker_loop() -> None:
+    while True:
+        _speech_queue.get().run()
+
+
+def _enqueue_speech(speak: Callable[[], object]) -> SpeechTask:
+    """Queues *speak* on the speech worker, starting the worker on first use."""
+    global _speech_worker
+    with _lock:
+        if _speech_worker is None:
+            _speech_worker = threading.Thread(target=_speech_worker_loop, name="tts-worker", daemon=True)
+            _speech_worker.start()
+        task = SpeechTask(speak, _stop_event)
+    _speech_queue.put(task)
+    return task
+
+
+def _split_sentences(text: str) -> list[str]:
+    """Splits text on sentence-ending punctuation."""
+    return [part.strip() for part in _SENTENCE_END.split(text) if part.strip()]
+
+
+class SentenceStream:
+    """
+    Turns streamed text (e.g. LLM token deltas) into complete sentences.
+    `feed()` from the producer, `close()` when done; iterating yields each
+    sentence as soon as it is complete. Pass it to `speak_async` to start
+    speaking before the full reply exists.
+    """
+
+    def __init__(self):
+        self._sentences: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._buffer = ""
+        self.has_text = False
+
+    def feed(self, delta: str) -> None:
+        self._buffer += delta
+        self.has_text = True
+        *complete, self._buffer = _SENTENCE_END.split(self._buffer)
+        for sentence in complete:
+            if sentence.strip():
+                self._sentences.put(sentence.strip())
+
+    def close(self) -> None:
+        if self._buffer.strip():
+            self._sentences.put(self._buffer.strip())
+        self._buffer = ""
+        self._sentences.put(None)
+
+    def __iter__(self):
+        while (sentence := self._sentences.get()) is not None:
+            yield sentence
+
+
+SpeechText = Union[str, Iterable[str]]
+
+
+def _as_text(text: SpeechText) -> str:
+    """Joins a sentence stream for engines that need the whole text (blocks until it closes)."""
+    return text if isinstance(text, str) else " ".join(text)
+
+
+def _speak_pipelined(text: SpeechText, synthesize: Callable[[str], object], play: Callable[[object], None]) -> None:
+    """
+    Synthesizes *text* sentence by sentence on the shared synthesis pool and
+    plays the clips in order, so the first sentence starts playing while the rest
+    are still being synthesized. *text* may also be an iterable of sentences
+    (e.g. a SentenceStream) that is still being produced.
+    Stops early when stop_speaking() is called.
+    """
+    stop_event = _stop_event
+    sentences = _split_sentences(text) if isinstance(text, str) else text
+    futures: "queue.Queue[Optional[Future]]" = queue.Queue()
+    # Set once playback ends for any reason (finished, stopped or failed) so the
+    # feeder stops submitting paid synthesis calls for a reply nobody will hear.
+    finished = threading.Event()
+
+    # Sentences are submitted by a task on the pool rather than by this thread,
+    # so playback of the first one never waits on the next one being produced.
+    def _submit_all():
+        try:
+            for sentence in sentences:
+                if stop_event.is_set() or finished.is_set():
+                    break
+                future = _synthesis_pool.submit(synthesize, sentence)
+                futures.put(future)
+                if finished.is_set():  # playback ended while submitting
+                    future.cancel()
+                    break
+        finally:
+            futures.put(None)
+
+    _synthesis_pool.submit(_submit_all)
+
+    try:
+        while not stop_event.is_set():
+            try:
+                future = futures.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            if future is None:
+                break
+            audio = future.result()
+            if stop_event.is_set():
+                break
+            play(audio)
+    finally:
+        finished.set()
+        while True:  # drop anything not yet played
+            try:
+                future = futures.get_nowait()
+            except queue.Empty:
+                break
+            if future is not None:
+                future.cancel()
+
+
+def _play_pcm(audio) -> None:
+    """Plays a (data, samplerate) tuple through sounddevice and waits for it."""
+    import sounddevice as sd
+
+    data, samplerate = audio
+    sd.play(data, samplerate)
+    sd.wait()
+
+
+def _speak_pyttsx3_async(text: str) -> SpeechTask | None:
+    """Speak via pyttsx3 on the speech worker."""
     try:
         import pyttsx3  # type: ignore
 
@@ -107,9 +292,7 @@ def _speak_pyttsx3_async(text: str) -> threading.Thread | None:
             eng.say(text)
             eng.runAndWait()
         
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return thread
+        return _enqueue_speech(_worker)
     except Exception:
         return None
 
@@ -132,7 +315,35 @@ def _speak_with_command_async(cmd: list[str], *, add_voice: bool = False) -> boo
             return False
 
 
-def _speak_openai_sync(text: str, voice: str) -> bool:
+_openai_client = None
+
+
+def _get_openai_client(api_key: str):
+    """Returns a shared OpenAI client so TTS requests reuse its connection pool."""
+    global _openai_client
+    with _lock:
+        if _openai_client is None or _openai_client.api_key != api_key:
+            _openai_client = OpenAI(api_key=api_key)  # type: ignore[misc]
+        return _openai_client
+
+
+_eleven_client = None
+_eleven_client_key: Optional[str] = None
+
+
+def _get_eleven_client(api_key: str):
+    """Returns a shared ElevenLabs (v2 SDK) client so requests reuse its HTTP session."""
+    global _eleven_client, _eleven_client_key
+    from elevenlabs.client import ElevenLabs  # type: ignore
+
+    with _lock:
+        if _eleven_client is None or _eleven_client_key != api_key:
+            _eleven_client = ElevenLabs(api_key=api_key)  # type: ignore[arg-type]
+            _eleven_client_key = api_key
+        return _eleven_client
+
+
+def _speak_openai_sync(text: SpeechText, voice: str) -> bool:
     """Use OpenAI TTS if available. Returns True if successful."""
     if OpenAI is None or voice.lower() not in _OPENAI_VOICES:
         return False
@@ -142,37 +353,34 @@ def _speak_openai_sync(text: str, voice: str) -> bool:
         return False
 
     try:
-        client = OpenAI(api_key=api_key)  # type: ignore[arg-type]
-
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice=voice.lower(),
-            input=text,
-            response_format="wav",
-        )
+        client = _get_openai_client(api_key)
 
         import soundfile as sf  # local import
-        import sounddevice as sd
 
-        wav_bytes = response.content  # type: ignore[attr-defined]
-        with io.BytesIO(wav_bytes) as bio:
-            data, samplerate = sf.read(bio, dtype="float32")
-        sd.play(data, samplerate)
-        sd.wait()
+        def _synthesize(sentence: str):
+            response = client.audio.speech.create(
+                model="tts-1",
+                voice=voice.lower(),
+                input=sentence,
+                response_format="wav",
+            )
+            wav_bytes = response.content  # type: ignore[attr-defined]
+            with io.BytesIO(wav_bytes) as bio:
+                return sf.read(bio, dtype="float32")
+
+        _speak_pipelined(text, _synthesize, _play_pcm)
         return True
     except Exception as exc:
         print(f"[OpenAI TTS error] {exc}")
         return False
 
 
-def _speak_eleven_sync(text: str, voice: str) -> bool:
+def _speak_eleven_sync(text: SpeechText, voice: str) -> bool:
     """Use ElevenLabs TTS if API key and library are available. Returns True on success."""
 
     if _eleven_generate is None and _eleven_play is None:
-        # Try newer v2+ SDK programmatic path
-        try:
-            from elevenlabs.client import ElevenLabs  # type: ignore
-        except Exception:
+        # Try newer v2+ SDK programmatic path (the client itself is imported by _get_eleven_client)
+        if importlib.util.find_spec("elevenlabs") is None:
             return False
 
         api_key = os.getenv("ELEVEN_API_KEY") or os.getenv("ELEVENLABS_API_KEY")
@@ -180,7 +388,7 @@ def _speak_eleven_sync(text: str, voice: str) -> bool:
             return False
 
         try:
-            client = ElevenLabs(api_key=api_key)  # type: ignore[arg-type]
+            client = _get_eleven_client(api_key)
 
             # If the provided voice looks like a name (not a 22-char id) resolve to id
             voice_id = voice
@@ -194,14 +402,18 @@ def _speak_eleven_sync(text: str, voice: str) -> bool:
                 except Exception:
                     pass
 
-            audio = client.text_to_speech.convert(
-                text=text,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_44100_128",
-            )
             from elevenlabs import play as _new_play  # type: ignore
-            _new_play(audio)  # type: ignore[arg-type]
+
+            def _synthesize(sentence: str) -> bytes:
+                audio = client.text_to_speech.convert(
+                    text=sentence,
+                    voice_id=voice_id,
+                    model_id="eleven_multilingual_v2",
+                    output_format="mp3_44100_128",
+                )
+                return b"".join(audio)
+
+            _speak_pipelined(text, _synthesize, _new_play)  # type: ignore[arg-type]
             return True
         except Exception as exc:  # pragma: no cover
             print(f"[ElevenLabs v2 TTS error] {exc}")
@@ -217,17 +429,20 @@ def _speak_eleven_sync(text: str, voice: str) -> bool:
 
     try:
         _eleven_set_api_key(api_key)  # type: ignore[arg-type]
-        audio_data = _eleven_generate(text=text, voice=voice)  # type: ignore[arg-type]
-        _eleven_play(audio_data)  # type: ignore[arg-type]
+        _speak_pipelined(
+            text,
+            lambda sentence: _eleven_generate(text=sentence, voice=voice),  # type: ignore[misc]
+            _eleven_play,  # type: ignore[arg-type]
+        )
         return True
     except Exception as exc:  # pragma: no cover
         print(f"[ElevenLabs legacy TTS error] {exc}")
         return False
 
 
-def _speak_eleven_async(text: str) -> threading.Thread | None:
-    """Speak using ElevenLabs in a background thread (non-blocking)."""
-    # Quick check for API key before starting thread.
+def _speak_eleven_async(text: SpeechText) -> SpeechTask | None:
+    """Speak using ElevenLabs on the speech worker (non-blocking)."""
+    # Quick check for API key before queueing.
     if not (os.getenv("ELEVEN_API_KEY") or os.getenv("ELEVENLABS_API_KEY")):
         return None
 
@@ -241,39 +456,34 @@ def _speak_eleven_async(text: str) -> threading.Thread | None:
     if _eleven_generate is None and not sdk_v2_present:
         return None
 
-    def _worker():
-        """Worker thread to call the synchronous speak method."""
-        _speak_eleven_sync(text, _current_voice())
-
-    thread = threading.Thread(target=_worker, daemon=True)
-    thread.start()
-    return thread
+    return _enqueue_speech(lambda: _speak_eleven_sync(text, _current_voice()))
 
 
 # ---------------------------------------------------------------------------
 # Public API
 # ---------------------------------------------------------------------------
 
-def speak_async(text: str) -> threading.Thread | None:
+def speak_async(text: SpeechText) -> SpeechTask | None:
     """
-    Speak *text* without blocking and return the thread.
+    Speak *text* without blocking and return its SpeechTask handle.
+    *text* may be a SentenceStream that is still being filled.
     Call `stop_speaking()` to interrupt.
     """
     # First stop anything that might still be playing
     stop_speaking()
+    _new_utterance()
 
     # Prefer ElevenLabs if available
-    if (thread := _speak_eleven_async(text)):
-        return thread
+    if (task := _speak_eleven_async(text)):
+        return task
 
     # Fallback to OpenAI
     if OpenAI is not None:
-        def _worker():
-            _speak_openai_sync(text, _current_voice())
-        
-        thread = threading.Thread(target=_worker, daemon=True)
-        thread.start()
-        return thread
+        return _enqueue_speech(lambda: _speak_openai_sync(text, _current_voice()))
+
+    if not isinstance(text, str):
+        # The remaining engines need the whole text, so wait for the stream on the worker
+        return _enqueue_speech(lambda: speak_sync(_as_text(text)))
 
     # Fallback to system commands
     if sys.platform == "darwin":
@@ -284,8 +494,8 @@ def speak_async(text: str) -> threading.Thread | None:
             return None # Cannot return thread for subprocess
 
     # Final fallback to pyttsx3
-    if (thread := _speak_pyttsx3_async(text)):
-        return thread
+    if (task := _speak_pyttsx3_async(text)):
+        return task
 
     print("Warning: No TTS engine available.")
     return None
@@ -305,6 +515,7 @@ def speak_sync(text: str) -> None:
     """Speak *text* and block until finished (no interruption)."""
 
     stop_speaking()
+    _new_utterance()
 
     voice = _current_voice()
 
@@ -351,8 +562,7 @@ def get_elevenlabs_voices():
         print("Warning: ELEVEN_API_KEY not set. Cannot fetch voices.")
         return []
     try:
-        from elevenlabs.client import ElevenLabs
-        client = ElevenLabs(api_key=api_key)
+        client = _get_eleven_client(api_key)
         voices = client.voices.get_all().voices
         # Format for display: [{"id": "...", "name": "..."}]
         return [{"id": v.voice_id, "name": v.name} for v in voices]
@@ -0,0 +1,80 @@
+import numpy as np
+
+import audio_in
+from audio_in import DEFAULT_FS, DEFAULT_RMS_THRESHOLD, _encode_wav, _is_near_silent, _wav_duration
+
+
+def _tone(seconds: float, rms: float) -> np.ndarray:
+    """A 220 Hz sine wave with the given RMS, in int16 units."""
+    t = np.arange(int(seconds * DEFAULT_FS)) / DEFAULT_FS
+    return (np.sin(2 * np.pi * 220 * t) * rms * np.sqrt(2)).astype(np.int16)
+
+
+def _capture(*parts: np.ndarray) -> bytearray:
+    return _encode_wav(np.concatenate(parts).reshape(-1, 1), DEFAULT_FS)
+
+
+def test_short_quiet_command_is_kept():
+    """A 0.6 s command just above the threshold, inside pre-roll and trailing silence."""
+    wav = _capture(_tone(0.5, 20), _tone(0.6, 353), _tone(1.0, 20))
+    assert not _is_near_silent(wav, DEFAULT_RMS_THRESHOLD)
+
+
+def test_room_noise_is_skipped():
+    wav = _capture(_tone(2.1, 100))
+    assert _is_near_silent(wav, DEFAULT_RMS_THRESHOLD)
+
+
+def test_single_click_is_skipped():
+    """One loud 30 ms frame is not enough to count as speech."""
+    wav = _capture(_tone(0.5, 20), _tone(0.03, 5000), _tone(1.0, 20))
+    assert _is_near_silent(wav, DEFAULT_RMS_THRESHOLD)
+
+
+class _NoisyRoom:
+    """Stands in for sd.RawInputStream: delivers 5 s of audio the VAD calls speech."""
+
+    def __init__(self, samplerate, channels, dtype, blocksize, callback):
+        self._blocksize = blocksize
+        self._callback = callback
+
+    def __enter__(self):
+        for _ in range(5 * DEFAULT_FS // self._blocksize):
+            self._callback(np.zeros(self._blocksize, dtype=np.int16).tobytes(), self._blocksize, None, None)
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class _AlwaysSpeech:
+    def is_speech(self, pcm, fs):
+        return True
+
+
+def test_recording_stops_at_max_seconds():
+    """Steady noise that never reads as silence still ends the capture at max_seconds."""
+    patched = {
+        "RawInputStream": (audio_in.sd, _NoisyRoom),
+        "_get_vad": (audio_in, lambda aggressiveness: _AlwaysSpeech()),
+        "_get_stop_speaking": (audio_in, lambda: (lambda: None)),
+        "_get_prewarm": (audio_in, lambda: (lambda: None)),
+    }
+    originals = {name: getattr(owner, name, None) for name, (owner, _) in patched.items()}
+    try:
+        for name, (owner, fake) in patched.items():
+            setattr(owner, name, fake)
+        wav = audio_in.capture_audio_stream(max_seconds=1.0)
+    finally:
+        for name, (owner, _) in patched.items():
+            setattr(owner, name, originals[name])
+    assert wav is not None
+    assert _wav_duration(wav) <= 1.0 + audio_in.VAD_FRAME_MS / 1000
+
+
+if __name__ == "__main__":
+    test_short_quiet_command_is_kept()
+    test_room_noise_is_skipped()
+    test_single_click_is_skipped()
+    test_recording_stops_at_max_seconds()
+    print("✅ Audio capture checks passed.")
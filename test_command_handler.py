@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+from types import SimpleNamespace
+
+os.environ.setdefault("OPENAI_API_KEY", "test-key")  # the module builds its client at import
+
+import command_handler
+
+
+def _tool_call(call_id: str, name: str, arguments: str = "{}") -> dict:
+    return {"id": call_id, "type": "function", "function": {"name": name, "arguments": arguments}}
+
+
+def test_side_effecting_tools_run_in_model_order():
+    """Reads run on the pool; sends, drafts and navigation run one by one, in order, on the caller."""
+    calls = []
+    caller = threading.current_thread()
+
+    def _fake(name):
+        def _tool(**kwargs):
+            calls.append((name, threading.current_thread() is caller))
+            return f"{name} done"
+        return _tool
+
+    tool_calls = [
+        _tool_call("1", "search_contacts", '{"name": "ann"}'),
+        _tool_call("2", "create_email_draft"),
+        _tool_call("3", "navigate_ui"),
+        _tool_call("4", "send_email"),
+        _tool_call("5", "get_my_profile"),
+    ]
+    replies = iter([
+        {"role": "assistant", "content": None, "tool_calls": tool_calls},
+        {"role": "assistant", "content": "Sent."},
+    ])
+
+    originals = dict(command_handler.available_functions), command_handler._stream_completion
+    try:
+        for call in tool_calls:
+            name = call["function"]["name"]
+            command_handler.available_functions[name] = _fake(name)
+        command_handler._stream_completion = lambda *args, **kwargs: next(replies)
+        messages = [command_handler.SYSTEM_PROMPT, {"role": "user", "content": "email ann"}]
+        assert command_handler._ask_llm(messages) == "Sent."
+    finally:
+        command_handler.available_functions.clear()
+        command_handler.available_functions.update(originals[0])
+        command_handler._stream_completion = originals[1]
+
+    side_effects = [(name, on_caller) for name, on_caller in calls if name not in command_handler.PARALLEL_SAFE_TOOLS]
+    assert side_effects == [("create_email_draft", True), ("navigate_ui", True), ("send_email", True)]
+    assert [m["tool_call_id"] for m in messages if m.get("role") == "tool"] == ["1", "2", "3", "4", "5"]
+
+
+def _conversation(turns: int) -> list:
+    history = [command_handler.SYSTEM_PROMPT]
+    for i in range(turns):
+        history += [{"role": "user", "content": f"q{i}"}, {"role": "assistant", "content": f"a{i}"}]
+    return history
+
+
+def test_compact_history_folds_old_turns_into_a_summary():
+    window = command_handler.HISTORY_WINDOW_TURNS
+    history = _conversation(window + 2)
+    command_handler._compact_history(history)
+
+    assert history[0] is command_handler.SYSTEM_PROMPT
+    assert history[1]["role"] == "system"
+    assert history[1]["content"] == command_handler._SUMMARY_PREFIX + "user: q0\nassistant: a0\nuser: q1\nassistant: a1"
+    assert [m["content"] for m in history[2:] if m["role"] == "user"] == [f"q{i}" for i in range(2, window + 2)]
+
+    # The next compaction extends the same summary instead of adding another one
+    history += [{"role": "user", "content": "q8"}, {"role": "assistant", "content": "a8"}]
+    command_handler._compact_history(history)
+    assert history[1]["content"].endswith("assistant: a1\nuser: q2\nassistant: a2")
+    assert sum(1 for m in history if m["role"] == "system") == 2
+
+
+def test_compact_history_leaves_short_conversations_alone():
+    history = _conversation(command_handler.HISTORY_WINDOW_TURNS)
+    before = list(history)
+    command_handler._compact_history(history)
+    assert history == before
+
+
+def test_compact_history_caps_the_summary():
+    history = [command_handler.SYSTEM_PROMPT]
+    for i in range(command_handler.HISTORY_WINDOW_TURNS + 3):
+        history += [{"role": "user", "content": "x" * 1500}, {"role": "assistant", "content": f"a{i}"}]
+    command_handler._compact_history(history)
+    summary = history[1]["content"][len(command_handler._SUMMARY_PREFIX):]
+    assert len(summary) == command_handler.HISTORY_SUMMARY_MAX_CHARS
+    assert summary.endswith("assistant: a2")  # the newest folded turn survives the cut
+
+
+def test_repeated_tool_results_are_sent_once():
+    listing = "event " * 100
+    messages = [
+        {"role": "tool", "tool_call_id": "a", "content": listing},
+        {"role": "tool", "tool_call_id": "b", "content": listing},
+        {"role": "tool", "tool_call_id": "c", "content": "short"},
+        {"role": "tool", "tool_call_id": "d", "content": "short"},
+    ]
+    deduped = command_handler._dedupe_tool_results(messages)
+    assert deduped[0]["content"] == listing
+    assert deduped[1]["content"] == "(Same result as tool call a above.)"
+    assert [m["content"] for m in deduped[2:]] == ["short", "short"]  # below MIN_DEDUPE_TOOL_CHARS
+    assert messages[1]["content"] == listing  # the stored history keeps the full result
+
+
+def test_oversized_tool_result_keeps_head_and_tail():
+    limit = command_handler.MAX_TOOL_RESULT_CHARS
+    content = "H" * limit + "T" * limit
+    compacted = command_handler._compact_tool_response(content)
+    assert compacted.startswith("H" * (limit // 2))
+    assert compacted.endswith("T" * (limit // 2))
+    assert f"truncated {limit} characters" in compacted
+    assert command_handler._compact_tool_response("small") == "small"
+    assert command_handler._compact_tool_response(None) is None
+
+
+class _FakeBatchClient:
+    """Stands in for the OpenAI client's files and batches APIs."""
+
+    def __init__(self, replies):
+        self.uploaded = ""
+        self._replies = replies
+        self._polls = 0
+        self.files = SimpleNamespace(create=self._upload, content=self._output)
+        self.batches = SimpleNamespace(create=self._create_batch, retrieve=self._retrieve)
+
+    def _upload(self, file, purpose):
+        self.uploaded = file[1].read().decode("utf-8")
+        return SimpleNamespace(id="file-in")
+
+    def _create_batch(self, input_file_id, endpoint, completion_window):
+        return SimpleNamespace(id="batch-1", status="validating", output_file_id=None)
+
+    def _retrieve(self, batch_id):
+        self._polls += 1
+        if self._polls < 2:
+            return SimpleNamespace(id=batch_id, status="in_progress", output_file_id=None)
+        return SimpleNamespace(id=batch_id, status="completed", output_file_id="file-out")
+
+    def _output(self, file_id):
+        lines = [
+            json.dumps({
+                "custom_id": custom_id,
+                "response": {"status_code": 200, "body": {"choices": [{"message": {"content": reply}}]}},
+            })
+            for custom_id, reply in self._replies
+        ]
+        lines.append(json.dumps({"custom_id": "2", "response": {"status_code": 500, "body": {}}}))
+        return SimpleNamespace(text="\n".join(lines))
+
+
+def test_ask_llm_batch_uses_chat_model_and_keeps_order():
+    fake = _FakeBatchClient([("1", "second"), ("0", "first")])  # results arrive out of order
+    original = command_handler.client
+    try:
+        command_handler.client = fake
+        conversations = [[{"role": "user", "content": f"q{i}"}] for i in range(3)]
+        replies = command_handler.ask_llm_batch(conversations, poll_seconds=0)
+    finally:
+        command_handler.client = original
+
+    assert replies == ["first", "second", None]  # the failed request comes back as None
+    requests = [json.loads(line) for line in fake.uploaded.splitlines()]
+    assert [r["custom_id"] for r in requests] == ["0", "1", "2"]
+    assert all(r["body"]["model"] == command_handler.CHAT_MODEL for r in requests)
+    assert requests[1]["body"]["messages"] == conversations[1]
+
+
+def test_ask_llm_batch_with_nothing_to_do():
+    assert command_handler.ask_llm_batch([]) == []
+
+
+if __name__ == "__main__":
+    test_side_effecting_tools_run_in_model_order()
+    test_compact_history_folds_old_turns_into_a_summary()
+    test_compact_history_leaves_short_conversations_alone()
+    test_compact_history_caps_the_summary()
+    test_repeated_tool_results_are_sent_once()
+    test_oversized_tool_result_keeps_head_and_tail()
+    test_ask_llm_batch_uses_chat_model_and_keeps_order()
+    test_ask_llm_batch_with_nothing_to_do()
+    print("✅ Command handler checks passed.")
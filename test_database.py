@@ -1,6 +1,6 @@
 import time
 import random
-from database import log_message, supabase
+from database import log_message, flush_messages, supabase
 
 def test_db_insertion():
     """
@@ -29,6 +29,7 @@ def test_db_insertion():
     
     # 3. Verify the insertion by querying for the unique message.
     print("Verifying insertion...")
+    flush_messages() # log_message writes in the background; wait for it.
     time.sleep(1) # Give the database a moment to process the insert.
 
     try:
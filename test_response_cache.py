@@ -0,0 +1,82 @@
+import time
+
+import numpy as np
+
+from response_cache import ResponseCache, normalize
+
+
+def test_normalize_ignores_case_punctuation_and_spacing():
+    assert normalize("  What's the   WEATHER like?! ") == "whats the weather like"
+
+
+def test_exact_match_after_normalization():
+    cache = ResponseCache()
+    cache.set("Who wrote Hamlet?", "Shakespeare.")
+    assert cache.get("who wrote hamlet") == "Shakespeare."
+    assert cache.get("who wrote macbeth") is None
+
+
+def test_empty_text_and_replies_are_not_cached():
+    cache = ResponseCache()
+    cache.set("?!", "Nothing.")
+    cache.set("who wrote hamlet", "")
+    assert cache.get("?!") is None
+    assert cache.get("who wrote hamlet") is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ResponseCache(max_entries=2)
+    cache.set("one", "1")
+    cache.set("two", "2")
+    assert cache.get("one") == "1"  # "two" is now the least recently used
+    cache.set("three", "3")
+    assert cache.get("two") is None
+    assert cache.get("one") == "1"
+    assert cache.get("three") == "3"
+
+
+def test_entries_expire_after_ttl():
+    cache = ResponseCache(ttl=0.01)
+    cache.set("who wrote hamlet", "Shakespeare.")
+    time.sleep(0.02)
+    assert cache.get("who wrote hamlet") is None
+
+
+def _fake_embed(text: str) -> np.ndarray:
+    """Questions about Hamlet point one way, everything else another."""
+    return np.array([1.0, 0.1]) if "hamlet" in text else np.array([0.0, 1.0])
+
+
+def test_similar_question_hits_through_embeddings():
+    cache = ResponseCache(similarity_threshold=0.9, embed=_fake_embed)
+    cache.set("who wrote hamlet", "Shakespeare.")
+    assert cache.get("tell me who the author of hamlet is") == "Shakespeare."
+    assert cache.get("what is the capital of france") is None
+
+
+def test_similarity_is_off_without_an_embedding_function():
+    cache = ResponseCache(similarity_threshold=0.9)
+    cache.set("who wrote hamlet", "Shakespeare.")
+    assert cache.get("tell me who the author of hamlet is") is None
+
+
+def test_failed_embedding_is_a_miss():
+    def _broken(text):
+        raise RuntimeError("embeddings down")
+
+    cache = ResponseCache(similarity_threshold=0.9, embed=_broken)
+    cache.set("who wrote hamlet", "Shakespeare.")
+    assert cache.get("who wrote hamlet") == "Shakespeare."  # exact match needs no embedding
+    assert cache.get("author of hamlet") is None
+
+
+if __name__ == "__main__":
+    test_normalize_ignores_case_punctuation_and_spacing()
+    test_exact_match_after_normalization()
+    test_empty_text_and_replies_are_not_cached()
+    test_least_recently_used_entry_is_evicted()
+    test_entries_expire_after_ttl()
+    test_similar_question_hits_through_embeddings()
+    test_similarity_is_off_without_an_embedding_function()
+    test_failed_embedding_is_a_miss()
+    print("✅ Response cache checks passed.")
@@ -0,0 +1,79 @@
+import threading
+import time
+
+from speak import SentenceStream, _speak_pipelined, _split_sentences
+
+
+def test_sentence_stream_yields_complete_sentences():
+    stream = SentenceStream()
+    for delta in ["Hel", "lo there. How", " are you? I'm", " fine! And", " you"]:
+        stream.feed(delta)
+    stream.close()
+    assert list(stream) == ["Hello there.", "How are you?", "I'm fine!", "And you"]
+    assert stream.has_text
+
+
+def test_sentence_stream_waits_for_the_space_after_punctuation():
+    """A period alone may be a decimal point, so the sentence isn't released until whitespace follows."""
+    stream = SentenceStream()
+    stream.feed("It costs 3.")
+    stream.feed("50 dollars. ")
+    stream.close()
+    assert list(stream) == ["It costs 3.50 dollars."]
+
+
+def test_empty_sentence_stream():
+    stream = SentenceStream()
+    stream.close()
+    assert list(stream) == []
+    assert not stream.has_text
+
+
+def test_split_sentences_drops_blank_parts():
+    assert _split_sentences("One.  Two?   Three!  ") == ["One.", "Two?", "Three!"]
+
+
+def test_pipelined_playback_keeps_sentence_order():
+    played = []
+    _speak_pipelined("One. Two. Three.", lambda sentence: sentence.upper(), played.append)
+    assert played == ["ONE.", "TWO.", "THREE."]
+
+
+def test_failed_synthesis_stops_the_feeder():
+    """After a synthesis error, the rest of the reply is never sent to the TTS service."""
+    synthesized = []
+
+    def _synthesize(sentence):
+        synthesized.append(sentence)
+        if sentence == "Boom.":
+            raise RuntimeError("TTS unavailable")
+        return sentence
+
+    stream = SentenceStream()
+
+    def _produce():
+        for sentence in ["Hi.", "Boom."] + [f"More {i}." for i in range(10)]:
+            stream.feed(sentence + " ")
+            time.sleep(0.02)
+        stream.close()
+
+    producer = threading.Thread(target=_produce)
+    producer.start()
+    try:
+        _speak_pipelined(stream, _synthesize, lambda audio: None)
+        raise AssertionError("the synthesis error should reach the caller")
+    except RuntimeError:
+        pass
+    producer.join()
+    time.sleep(0.1)
+    assert synthesized == ["Hi.", "Boom."]
+
+
+if __name__ == "__main__":
+    test_sentence_stream_yields_complete_sentences()
+    test_sentence_stream_waits_for_the_space_after_punctuation()
+    test_empty_sentence_stream()
+    test_split_sentences_drops_blank_parts()
+    test_pipelined_playback_keeps_sentence_order()
+    test_failed_synthesis_stops_the_feeder()
+    print("✅ Speech checks passed.")
@@ -63,6 +63,8 @@ def search_contacts(name: str) -> str:
                     personFields="names,emailAddresses,phoneNumbers",
                     pageSize=1000,
                     pageToken=page_token,
+                    # Only what the fuzzy match and the result below use
+                    fields="connections(resourceName,names/displayName,emailAddresses/value,phoneNumbers/value),nextPageToken",
                 )
                 .execute()
             )
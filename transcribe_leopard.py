@@ -1,29 +1,94 @@
 from __future__ import annotations
 
 import os
+import atexit
+import hashlib
+import threading
+from collections import OrderedDict
+import wave
+import numpy as np  # type: ignore
 import pvleopard
-import soundfile as sf
 import io
 
+# Transcripts keyed by a hash of the audio, so re-submitted buffers skip Leopard.
+TRANSCRIPT_CACHE_SIZE = 128
+_transcript_cache: "OrderedDict[str, str]" = OrderedDict()
+
+
+# Leopard loads its model on create(), so one instance is shared for the process.
+_leopard = None
+_leopard_lock = threading.Lock()
+
+
+def _get_leopard():
+    """Creates the shared Leopard instance on first use."""
+    global _leopard
+    with _leopard_lock:
+        if _leopard is None:
+            access_key = os.getenv("PICOVOICE_ACCESS_KEY")
+            if not access_key:
+                raise ValueError("PICOVOICE_ACCESS_KEY environment variable not set.")
+            _leopard = pvleopard.create(access_key=access_key)
+        return _leopard
+
+
+def prewarm_leopard() -> None:
+    """
+    Loads the Leopard model on a background thread so the first transcription
+    doesn't pay for it. Called when recording starts, while the user is still speaking.
+    """
+    if _leopard is not None:
+        return
+
+    def _load():
+        try:
+            _get_leopard()
+        except Exception as e:
+            print(f"Could not pre-load Leopard: {e}")
+
+    threading.Thread(target=_load, daemon=True).start()
+
+
+@atexit.register
+def _release_leopard():
+    global _leopard
+    with _leopard_lock:
+        if _leopard is not None:
+            _leopard.delete()
+            _leopard = None
+
+
+def _audio_key(wav_bytes: bytes) -> str:
+    """Content hash of the audio buffer used as the transcript cache key."""
+    return hashlib.blake2b(wav_bytes, digest_size=16).hexdigest()
+
+
 def transcribe_with_leopard(wav_bytes: bytes) -> str:
     """
     Transcribes audio using the on-device Picovoice Leopard engine.
+    Results are cached by audio content hash (LRU, TRANSCRIPT_CACHE_SIZE entries).
 
     :param wav_bytes: The audio data in WAV format (bytes).
     :return: The transcribed text, converted to lowercase.
     """
-    access_key = os.getenv("PICOVOICE_ACCESS_KEY")
-    if not access_key:
-        raise ValueError("PICOVOICE_ACCESS_KEY environment variable not set.")
+    key = _audio_key(wav_bytes)
+    cached = _transcript_cache.get(key)
+    if cached is not None:
+        _transcript_cache.move_to_end(key)
+        print(f"✍️  Leopard transcript cache hit: '{cached}'")
+        return cached
 
-    leopard = None
     try:
-        leopard = pvleopard.create(access_key=access_key)
-        
-        # Leopard processes a list of raw PCM data, not WAV bytes.
-        # We use soundfile to read the PCM data from the in-memory WAV file.
-        with io.BytesIO(wav_bytes) as wav_buffer:
-            pcm, samplerate = sf.read(wav_buffer, dtype='int16')
+        leopard = _get_leopard()
+
+        # Leopard processes raw PCM, not WAV bytes. The buffer from audio_in is
+        # already 16-bit PCM, so the header is parsed and the samples used as-is
+        # instead of being decoded through libsndfile.
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
+            if wav_file.getsampwidth() != 2:
+                raise ValueError(f"Expected 16-bit PCM, got {8 * wav_file.getsampwidth()}-bit")
+            samplerate = wav_file.getframerate()
+            pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
 
         # This check is a safeguard; it should pass if audio_in.py is correct.
         if samplerate != leopard.sample_rate:
@@ -34,11 +99,12 @@ def transcribe_with_leopard(wav_bytes: bytes) -> str:
         # Standardize to lowercase for easier command processing
         transcript_lower = transcript.lower()
         print(f"✍️  Leopard transcribed text: '{transcript_lower}'")
+
+        _transcript_cache[key] = transcript_lower
+        if len(_transcript_cache) > TRANSCRIPT_CACHE_SIZE:
+            _transcript_cache.popitem(last=False)
         return transcript_lower
 
     except Exception as e:
         print(f"Error during Leopard transcription: {e}")
-        return ""
-    finally:
-        if leopard:
-            leopard.delete() 
\ No newline at end of file
+        return "" 
\ No newline at end of file
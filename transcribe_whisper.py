@@ -0,0 +1,100 @@
+"""transcribe_whisper.py
+Optional on-device transcription with faster-whisper (CTranslate2).
+
+Enable it with `STT_ENGINE=whisper` (requires `pip install faster-whisper`).
+Utterances are decoded with `BatchedInferencePipeline`, which splits the audio
+on its own VAD segments and decodes them as one batch. Weights are quantized
+to int8 by default (`int8_float16` on CUDA); override with WHISPER_COMPUTE_TYPE.
+Decoding is greedy (beam size 1), which is plenty for short voice commands;
+set WHISPER_BEAM_SIZE to trade speed for accuracy.
+"""
+from __future__ import annotations
+
+import io
+import os
+import threading
+import wave
+
+import numpy as np  # type: ignore
+
+try:
+    import ctranslate2  # type: ignore
+    from faster_whisper import BatchedInferencePipeline, WhisperModel  # type: ignore
+except ImportError:  # pragma: no cover
+    ctranslate2 = BatchedInferencePipeline = WhisperModel = None  # type: ignore
+
+DEFAULT_WHISPER_MODEL = "large-v3-turbo"
+WHISPER_SAMPLE_RATE = 16_000
+WHISPER_BATCH_SIZE = 8
+WHISPER_BEAM_SIZE = int(os.getenv("WHISPER_BEAM_SIZE", "1"))
+
+# The model is loaded once and shared, like the Leopard instance.
+_pipeline = None
+_pipeline_lock = threading.Lock()
+
+
+def _get_pipeline():
+    """Loads the shared faster-whisper pipeline on first use."""
+    global _pipeline
+    with _pipeline_lock:
+        if _pipeline is None:
+            if WhisperModel is None:
+                raise ImportError("faster-whisper is required for STT_ENGINE=whisper.")
+            device = "cuda" if ctranslate2.get_cuda_device_count() > 0 else "cpu"
+            compute_type = os.getenv("WHISPER_COMPUTE_TYPE") or ("int8_float16" if device == "cuda" else "int8")
+            model = WhisperModel(
+                os.getenv("WHISPER_MODEL", DEFAULT_WHISPER_MODEL), device=device, compute_type=compute_type
+            )
+            # One dummy decode so the first real utterance doesn't pay for kernel/allocator warm-up
+            segments, _ = model.transcribe(
+                np.zeros(WHISPER_SAMPLE_RATE, dtype=np.float32), beam_size=WHISPER_BEAM_SIZE, vad_filter=False
+            )
+            list(segments)
+            print(f"✍️  Whisper model loaded on {device} ({compute_type}).")
+            _pipeline = BatchedInferencePipeline(model=model)
+        return _pipeline
+
+
+def prewarm_whisper() -> None:
+    """Loads the Whisper model on a background thread while the user is still speaking."""
+    if _pipeline is not None:
+        return
+
+    def _load():
+        try:
+            _get_pipeline()
+        except Exception as e:
+            print(f"Could not pre-load Whisper: {e}")
+
+    threading.Thread(target=_load, daemon=True).start()
+
+
+def transcribe_with_whisper(wav_bytes: bytes) -> str:
+    """
+    Transcribes audio on-device with faster-whisper.
+
+    :param wav_bytes: 16 kHz mono 16-bit PCM audio in WAV format (bytes).
+    :return: The transcribed text, converted to lowercase.
+    """
+    try:
+        pipeline = _get_pipeline()
+        with wave.open(io.BytesIO(wav_bytes), "rb") as wav_file:
+            if wav_file.getframerate() != WHISPER_SAMPLE_RATE:
+                raise ValueError(f"Incorrect sample rate: got {wav_file.getframerate()}, expected {WHISPER_SAMPLE_RATE}")
+            pcm = np.frombuffer(wav_file.readframes(wav_file.getnframes()), dtype="<i2")
+
+        audio = pcm.astype(np.float32) / 32768.0
+        segments, _ = pipeline.transcribe(
+            audio,
+            batch_size=WHISPER_BATCH_SIZE,
+            beam_size=WHISPER_BEAM_SIZE,
+            condition_on_previous_text=False,
+            vad_filter=True,
+        )
+        transcript_lower = " ".join(segment.text.strip() for segment in segments).lower()
+        print(f"✍️  Whisper transcribed text: '{transcript_lower}'")
+        return transcript_lower
+
+    except Exception as e:
+        print(f"Error during Whisper transcription: {e}")
+        return ""
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import os
+import atexit
 import struct
 import sys
 
@@ -14,6 +15,26 @@ try:
 except ImportError:
     pass
 
+# Porcupine instances keyed by wake word, created once and reused across calls.
+_porcupines: dict[str, "pvporcupine.Porcupine"] = {}
+
+
+def _get_porcupine(access_key: str, keyword: str):
+    """Returns the cached Porcupine instance for *keyword*, creating it on first use."""
+    porcupine = _porcupines.get(keyword)
+    if porcupine is None:
+        porcupine = pvporcupine.create(access_key=access_key, keywords=[keyword])
+        _porcupines[keyword] = porcupine
+    return porcupine
+
+
+@atexit.register
+def _release_porcupines():
+    for porcupine in _porcupines.values():
+        porcupine.delete()
+    _porcupines.clear()
+
+
 def listen_for_wake_word(keyword: str = "computer") -> bool:
     """
     Listens for a specific wake word using pvporcupine.
@@ -32,10 +53,7 @@ def listen_for_wake_word(keyword: str = "computer") -> bool:
         return False
 
     try:
-        porcupine = pvporcupine.create(
-            access_key=access_key,
-            keywords=[keyword]
-        )
+        porcupine = _get_porcupine(access_key, keyword)
     except pvporcupine.PorcupineInvalidArgumentError as e:
         print(f"Error initializing Porcupine with keyword '{keyword}': {e}", file=sys.stderr)
         print(f"Available keywords: {pvporcupine.KEYWORDS}", file=sys.stderr)
@@ -73,8 +91,5 @@ def listen_for_wake_word(keyword: str = "computer") -> bool:
         print("Stopping wake word listener.")
     except Exception as e:
         print(f"An error occurred during audio streaming: {e}", file=sys.stderr)
-    finally:
-        if porcupine:
-            porcupine.delete()
     
     return False